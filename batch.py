@@ -1,30 +1,25 @@
-import os
-import random
+import logging
 
-from reactor import utils
-from reactor.mapgenerator import MapGenerator
+from reactor.batchrunner import COMPLETE, BatchRunner
+from reactor.budget import Budget
 
 
 NUM_PERMUTATIONS = 20
 GRID_PATH = 'data/reactor5.gexf'
+MAX_TIME = 30
+JOB_TIMEOUT = 60
 
 
 if __name__ == '__main__':
-
-    for i in range(NUM_PERMUTATIONS):
-
-        # Set random seed and run map generator.
-        random.seed(i)
-        gen = MapGenerator(GRID_PATH)
-        try:
-            map_ = gen.run()
-        except:
-            continue
-
-        # Resolve output path name.
-        dir_name = os.path.splitext(os.path.split(GRID_PATH)[-1])[0]
-        file_name = '{0:03d}'.format(i)
-        file_path = os.path.join('output', dir_name, file_name) + '.png'
-
-        # Save map to file.
-        utils.draw_map(map_, file_path)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    runner = BatchRunner(
+        [GRID_PATH],
+        range(NUM_PERMUTATIONS),
+        budget=Budget(max_time=MAX_TIME),
+        job_timeout=JOB_TIMEOUT
+    )
+    records = runner.run()
+    for record in records:
+        if record['status'] != COMPLETE:
+            print('incomplete:', record['seed'], record)
@@ -1,40 +1,27 @@
+import logging
 import os
-import random
 
-from reactor import utils
-from reactor.mapgenerator import MapGenerator
+from reactor.batchrunner import BatchRunner
+from reactor.budget import Budget
 
 
 NUM_PERMUTATIONS = 20
 DIR_PATH = 'data'
 GRID_EXTN = '.gexf'
-
-KNOWN_ISSUES = ['bow1', 'single_node1', 'wrong_degree1']
+MAX_TIME = 30
+JOB_TIMEOUT = 60
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     all_names = os.listdir(DIR_PATH)
     grid_names = filter(lambda x: os.path.splitext(x)[-1] == GRID_EXTN, all_names)
-    ok_names = list(filter(lambda x: os.path.splitext(x)[0] not in KNOWN_ISSUES, grid_names))
-
-    ok_names = ok_names[ok_names.index('tree3.gexf'):]
-    for grid_name in ok_names:
-        grid_path = os.path.join(DIR_PATH, grid_name)
-        for i in range(NUM_PERMUTATIONS):
-
-            # Set random seed and run map generator.
-            random.seed(i)
-            gen = MapGenerator(grid_path)
-            try:
-                map_ = gen.run()
-            except:
-                continue
-
-            # Resolve output path name.
-            dir_name = os.path.splitext(os.path.split(grid_path)[-1])[0]
-            file_name = '{0:03d}'.format(i)
-            file_path = os.path.join('output', dir_name, file_name) + '.png'
-
-            # Save map to file.
-            print('saving:', file_path)
-            utils.draw_map(map_, file_path)
+    grid_paths = [os.path.join(DIR_PATH, grid_name) for grid_name in sorted(grid_names)]
+    runner = BatchRunner(
+        grid_paths,
+        range(NUM_PERMUTATIONS),
+        budget=Budget(max_time=MAX_TIME),
+        job_timeout=JOB_TIMEOUT
+    )
+    runner.run()
+    print('manifest:', runner.manifest_path)
@@ -0,0 +1,27 @@
+import os
+
+from reactor.mapgenerator import MapGenerator
+from reactor.mapplan import PLAN_EXTN
+
+
+DIR_PATH = 'data'
+GRID_EXTN = '.gexf'
+OUTPUT_PATH = os.path.join('output', 'plans')
+
+
+if __name__ == '__main__':
+    if not os.path.isdir(OUTPUT_PATH):
+        os.makedirs(OUTPUT_PATH)
+    all_names = os.listdir(DIR_PATH)
+    grid_names = filter(lambda x: os.path.splitext(x)[-1] == GRID_EXTN, all_names)
+    for grid_name in sorted(grid_names):
+        grid_path = os.path.join(DIR_PATH, grid_name)
+        try:
+            plan = MapGenerator(grid_path).load_plan()
+        except Exception as e:
+            print('failed:', grid_path, repr(e))
+            continue
+        file_name = os.path.splitext(grid_name)[0] + PLAN_EXTN
+        file_path = os.path.join(OUTPUT_PATH, file_name)
+        print('saving:', file_path)
+        plan.save(file_path)
@@ -1,5 +1,4 @@
 import random
-random.seed(0)
 
 from reactor import utils
 from reactor.mapgenerator import MapGenerator
@@ -12,6 +11,6 @@ GRID_PATH = 'data/tree1.gexf'
 
 
 if __name__ == '__main__':
-    gen = MapGenerator(GRID_PATH)
+    gen = MapGenerator(GRID_PATH, rng=random.Random(0))
     map_ = gen.run()
     utils.draw_map(map_)
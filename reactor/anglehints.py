@@ -0,0 +1,146 @@
+import random
+import time
+
+import numpy as np
+
+from reactor.wfc.anglewavefunction import AngleWaveFunction
+from reactor.wfc.wavefunctionbase import Contradiction, SolveAborted
+
+
+DEFAULT_MAX_SOLUTIONS = 4
+DEFAULT_MAX_STEPS = 10000
+
+# Share of the search's time budget that solving may use.
+TIME_SHARE = 0.05
+
+
+class AngleHints(object):
+
+    """
+    Globally consistent angle assignments for the faces of a graph, solved
+    lazily with the angle wave function. Each solution assigns every face an
+    angle per node such that faces close and the angles around shared nodes
+    add up.
+
+    Solutions are only solved as they're asked for. If a monitor is given,
+    the first solution is solved when the first face asks for it, and each
+    alternative only after the search has backtracked since the last solve,
+    so a search that doesn't backtrack pays for one solve at most.
+
+    Each solve is bounded by a number of steps, and all solves together by
+    max_time seconds. If a monitor is given, solving also stops as soon as the
+    search budget runs out. Once a solve fails no more hints are given and
+    faces fall back to their plain permutations.
+
+    """
+
+    def __init__(
+        self,
+        g,
+        faces,
+        rng=random,
+        max_solutions=DEFAULT_MAX_SOLUTIONS,
+        max_steps=DEFAULT_MAX_STEPS,
+        max_time=None,
+        monitor=None
+    ):
+        self._g = g
+        self._faces = list(faces)
+        self._rng = rng
+        self._max_solutions = max_solutions
+        self._max_steps = max_steps
+        self._max_time = max_time
+        self._monitor = monitor
+        self._solutions = []
+        self._solver = self._solve()
+        self._solve_time = 0
+        self._solve_start = None
+        self._num_backtracks = None
+
+    @classmethod
+    def from_budget(cls, g, faces, rng, monitor):
+        """
+        Return hints for the given search, limited to a small share of its
+        time budget.
+
+        """
+        max_time = monitor.budget.max_time
+        if max_time is not None:
+            max_time *= TIME_SHARE
+        return cls(g, faces, rng, max_time=max_time, monitor=monitor)
+
+    def _is_stopped(self):
+        if self._monitor is not None and self._monitor.get_status() is not None:
+            return True
+        if self._max_time is None:
+            return False
+        elapsed = time.perf_counter() - self._solve_start
+        return self._solve_time + elapsed >= self._max_time
+
+    def _can_solve(self):
+        if self._monitor is None or self._num_backtracks is None:
+            return True
+        return self._monitor.num_backtracks > self._num_backtracks
+
+    def _solve(self):
+        seen = set()
+        for _ in range(self._max_solutions * 2):
+            if self._is_stopped():
+                return
+            np_rng = np.random.default_rng(self._rng.getrandbits(32))
+            wf = AngleWaveFunction(self._g, self._faces, rng=np_rng)
+            wf.max_steps = self._max_steps
+            wf.stop_func = self._is_stopped
+
+            # A contradiction means the search ran out of tiles, so there's no
+            # consistent solution. An aborted solve may have had one, but the
+            # next seed is unlikely to do better within the same limits.
+            try:
+                wf.run()
+            except (Contradiction, SolveAborted):
+                return
+
+            solution = wf.get_block_angles()
+            key = tuple(
+                tuple(sorted(solution[face].items())) for face in self._faces
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+            yield solution
+            if len(seen) == self._max_solutions:
+                return
+
+    def get_solution(self, index):
+        """
+        Return the solution at the given index, or None if there isn't one or
+        it can't be solved yet.
+
+        """
+        while len(self._solutions) <= index:
+            if not self._can_solve():
+                return None
+            self._solve_start = time.perf_counter()
+            try:
+                solution = next(self._solver, None)
+            finally:
+                self._solve_time += time.perf_counter() - self._solve_start
+            if self._monitor is not None:
+                self._num_backtracks = self._monitor.num_backtracks
+            if solution is None:
+                return None
+            self._solutions.append(solution)
+        return self._solutions[index]
+
+    def get_face_angles(self, face):
+        """
+        Lazily yield the angles of the given face from each solution in turn.
+
+        """
+        i = 0
+        while True:
+            solution = self.get_solution(i)
+            if solution is None:
+                return
+            yield solution[face]
+            i += 1
@@ -0,0 +1,69 @@
+class AngleIndex(object):
+
+    """
+    The angles of laid out faces keyed by (node, face). Running totals of the
+    angles at each node are kept as faces are added and removed, so the angle
+    sums needed to constrain a new face are constant time rather than a sum
+    over the node's faces.
+
+    """
+
+    def __init__(self):
+        self._angles = {}
+        self._totals = {}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._angles)
+
+    def __contains__(self, node):
+        return self._counts.get(node, 0) > 0
+
+    def add(self, node, face, angle):
+        old_angle = self._angles.get((node, face))
+        if old_angle is not None:
+            self._totals[node] -= old_angle
+        else:
+            self._counts[node] = self._counts.get(node, 0) + 1
+        self._angles[node, face] = angle
+        self._totals[node] = self._totals.get(node, 0) + angle
+
+    def remove(self, node, face):
+        angle = self._angles.pop((node, face), None)
+        if angle is None:
+            return None
+        self._counts[node] -= 1
+        if self._counts[node]:
+            self._totals[node] -= angle
+        else:
+            del self._counts[node]
+            del self._totals[node]
+        return angle
+
+    def get(self, node, face):
+        return self._angles.get((node, face))
+
+    def get_num_faces(self, node):
+        return self._counts.get(node, 0)
+
+    def get_total(self, node):
+        """
+        Return the sum of the angles at the given node.
+
+        """
+        return self._totals.get(node, 0)
+
+    def get_explementary_total(self, node):
+        """
+        Return the sum of 180 minus each angle at the given node, ie the
+        amount each face turns the outer boundary by at that node.
+
+        """
+        return 180 * self.get_num_faces(node) - self.get_total(node)
+
+    def copy(self):
+        index = self.__class__()
+        index._angles = dict(self._angles)
+        index._totals = dict(self._totals)
+        index._counts = dict(self._counts)
+        return index
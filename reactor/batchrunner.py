@@ -0,0 +1,360 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import time
+from collections import deque
+from operator import itemgetter
+
+from reactor.mapgenerator import MapGenerator
+from reactor.mapplan import MapPlan
+from reactor.nogoodstore import NogoodStore
+from reactor.rasteriser import DEFAULT_SCALE, MapRasteriser
+
+
+OUTPUT_PATH = 'output'
+MANIFEST_NAME = 'manifest.jsonl'
+NOGOOD_NAME = 'nogoods.json'
+
+COMPLETE = 'complete'
+INCOMPLETE = 'incomplete'
+ERROR = 'error'
+LOAD_ERROR = 'load_error'
+TIMEOUT = 'timeout'
+
+
+logger = logging.getLogger(__name__)
+
+
+# Per worker state, set by the pool initialiser. Plans are rebuilt once per
+# worker so that jobs only pay for layout and room placement.
+_worker = {}
+
+
+def get_grid_name(grid_path):
+    return os.path.splitext(os.path.split(grid_path)[-1])[0]
+
+
+def get_nogood_path(output_path, grid_path):
+    return os.path.join(output_path, get_grid_name(grid_path), NOGOOD_NAME)
+
+
+def _init_worker(plan_data, budget, profiles, output_path, draw, scale, nogood_data):
+    _worker['plans'] = {
+        grid_path: MapPlan.from_data(data)
+        for grid_path, data in plan_data.items()
+    }
+    _worker['budget'] = budget
+    _worker['profiles'] = profiles
+    _worker['output_path'] = output_path
+    _worker['rasteriser'] = MapRasteriser(scale) if draw else None
+
+    # Each worker learns nogoods for the seeds it runs, starting from those
+    # the parent has gathered so far.
+    _worker['nogoods'] = None
+    if nogood_data is not None:
+        _worker['nogoods'] = {
+            grid_path: NogoodStore.from_data(data)
+            for grid_path, data in nogood_data.items()
+        }
+
+
+def _run_job(job):
+    """
+    Run a single (grid path, seed) job in a worker and return its manifest
+    record, along with the nogoods learned during the job if nogoods are
+    enabled. Failures are recorded rather than raised so the pool carries on.
+
+    """
+    grid_path, seed = job
+    record = {'grid': grid_path, 'seed': seed, 'output': None}
+    start = time.perf_counter()
+    store = None
+    if _worker['nogoods'] is not None:
+        store = _worker['nogoods'][grid_path]
+    mark = store.mark() if store is not None else None
+    gen = MapGenerator(
+        grid_path,
+        nogoods=store,
+        budget=_worker['budget'],
+        rng=random.Random(seed),
+        profiles=_worker['profiles']
+    )
+    try:
+        map_ = gen.run(_worker['plans'][grid_path])
+    except Exception as e:
+        record.update({
+            'status': ERROR,
+            'error': '{}: {}'.format(type(e).__name__, e),
+            'time': time.perf_counter() - start,
+        })
+        return record, store.to_data(mark) if store is not None else None
+
+    result = map_.layout_result
+    record.update({
+        'status': COMPLETE if result.complete else INCOMPLETE,
+        'layout_status': result.status.value,
+        'num_blocks': result.num_blocks,
+        'num_placed': result.num_placed,
+        'num_permutations': result.num_permutations,
+        'num_backtracks': result.num_backtracks,
+        'layout_time': result.elapsed,
+    })
+    if result.complete and _worker['rasteriser'] is not None:
+        file_name = '{0:03d}.png'.format(seed)
+        file_path = os.path.join(_worker['output_path'], get_grid_name(grid_path), file_name)
+        _worker['rasteriser'].save(map_, file_path)
+        record['output'] = file_path
+    record['time'] = time.perf_counter() - start
+    return record, store.to_data(mark) if store is not None else None
+
+
+class BatchRunner(object):
+
+    """
+    Generate maps for every combination of grid path and seed over a process
+    pool, writing a JSON lines manifest with a record per job.
+
+    Graphs are compiled to plans once up front and handed to every worker.
+    Each job's layout is limited by the given budget, which the search checks
+    as it goes. The job timeout is a hard wall-clock limit on top of that for
+    anything the budget doesn't cover - a job that runs over it is recorded as
+    timed out and the pool is restarted to free its worker, with the other
+    running jobs resubmitted. Jobs are handed out longest first, using times
+    from a previous manifest if there is one or the size of the graph
+    otherwise, which keeps every process busy until the end of the sweep.
+
+    With nogoods enabled, workers start from the nogoods saved by earlier runs
+    and send back what each job learns. These are merged per graph and saved
+    when the run ends. Saved nogoods of an older version are ignored.
+
+    With resume enabled, jobs that completed or ran out of budget in the
+    previous manifest are carried over rather than run again.
+
+    """
+
+    def __init__(
+        self,
+        grid_paths,
+        seeds,
+        budget=None,
+        processes=None,
+        output_path=OUTPUT_PATH,
+        draw=True,
+        scale=DEFAULT_SCALE,
+        nogoods=False,
+        job_timeout=None,
+        profiles=None,
+        resume=False
+    ):
+        self._grid_paths = list(grid_paths)
+        self._seeds = list(seeds)
+        self._budget = budget
+        self._processes = processes
+        self._output_path = output_path
+        self._draw = draw
+        self._scale = scale
+        self._nogoods = nogoods
+        self._job_timeout = job_timeout
+        self._profiles = profiles
+        self._resume = resume
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self._output_path, MANIFEST_NAME)
+
+    def compile_plans(self):
+        """
+        Return the plans of all grid paths that can be loaded, plus a load
+        error record per seed for any that can't.
+
+        """
+        plans = {}
+        records = []
+        for grid_path in self._grid_paths:
+            try:
+                plans[grid_path] = MapGenerator(grid_path).load_plan()
+            except Exception as e:
+                error = '{}: {}'.format(type(e).__name__, e)
+                records.extend(
+                    {'grid': grid_path, 'seed': seed, 'status': LOAD_ERROR, 'error': error}
+                    for seed in self._seeds
+                )
+        return plans, records
+
+    def load_manifest(self):
+        """
+        Return the records of the previous manifest, if there is one.
+
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as f:
+            return [json.loads(line) for line in f]
+
+    def load_job_times(self):
+        """
+        Return the mean job time per grid path from the previous manifest.
+
+        """
+        times = {}
+        for record in self.load_manifest():
+            if 'time' in record:
+                times.setdefault(record['grid'], []).append(record['time'])
+        return {grid_path: sum(ts) / len(ts) for grid_path, ts in times.items()}
+
+    def get_jobs(self, plans):
+        """
+        Return all jobs sorted by estimated cost, most expensive first.
+
+        """
+        times = self.load_job_times()
+
+        # Graphs without timings are only compared with each other by size,
+        # and go first as their cost is unknown.
+        def get_cost(grid_path):
+            if grid_path in times:
+                return 0, times[grid_path]
+            return 1, len(plans[grid_path].blocks)
+
+        grid_paths = sorted(plans, key=get_cost, reverse=True)
+        return [(grid_path, seed) for grid_path in grid_paths for seed in self._seeds]
+
+    def load_nogoods(self, plans):
+        """
+        Return a nogood store per grid path, starting from any saved by a
+        previous run.
+
+        """
+        stores = {}
+        for grid_path in plans:
+            nogood_path = get_nogood_path(self._output_path, grid_path)
+            stores[grid_path] = NogoodStore()
+            if not os.path.exists(nogood_path):
+                continue
+            try:
+                stores[grid_path] = NogoodStore.load(nogood_path)
+            except ValueError as e:
+                logger.warning('Ignoring %s: %s', nogood_path, e)
+        return stores
+
+    def run_pool(self, pool, processes, jobs):
+        """
+        Submit jobs from the given queue to the pool and yield each job's
+        record and learned nogoods as it completes. Only one job per process
+        is submitted at a time, so a job's timeout runs from roughly when it
+        starts.
+
+        If a job times out, a timeout record is yielded for it and all other
+        running jobs are put back at the front of the queue. The pool must
+        then be terminated to free the worker.
+
+        """
+        results = queue.Queue()
+        running = {}
+        while jobs or running:
+            while jobs and len(running) < processes:
+                job = jobs.popleft()
+                running[job] = time.perf_counter()
+                pool.apply_async(
+                    _run_job,
+                    (job,),
+                    callback=lambda result, job=job: results.put((job, result)),
+                    error_callback=lambda e, job=job: results.put((job, e))
+                )
+
+            # Wait for a result, but no longer than the oldest running job has
+            # left.
+            timeout = None
+            if self._job_timeout is not None:
+                oldest, start = min(running.items(), key=itemgetter(1))
+                timeout = max(start + self._job_timeout - time.perf_counter(), 0)
+            try:
+                job, result = results.get(timeout=timeout)
+            except queue.Empty:
+                del running[oldest]
+                jobs.extendleft(reversed(list(running)))
+                grid_path, seed = oldest
+                record = {
+                    'grid': grid_path,
+                    'seed': seed,
+                    'output': None,
+                    'status': TIMEOUT,
+                    'time': self._job_timeout,
+                }
+                yield record, None
+                return
+
+            start = running.pop(job)
+            if isinstance(result, Exception):
+                grid_path, seed = job
+                record = {
+                    'grid': grid_path,
+                    'seed': seed,
+                    'output': None,
+                    'status': ERROR,
+                    'error': '{}: {}'.format(type(result).__name__, result),
+                    'time': time.perf_counter() - start,
+                }
+                result = record, None
+            yield result
+
+    def run(self):
+        """
+        Run all jobs and return their records, which are also written to the
+        manifest as they complete.
+
+        """
+        plans, records = self.compile_plans()
+        jobs = deque(self.get_jobs(plans))
+        if self._resume:
+            done = {
+                (record['grid'], record['seed']): record
+                for record in self.load_manifest()
+                if record['status'] in (COMPLETE, INCOMPLETE)
+            }
+            records.extend(done[job] for job in jobs if job in done)
+            jobs = deque(job for job in jobs if job not in done)
+        plan_data = {grid_path: plan.to_data() for grid_path, plan in plans.items()}
+        stores = self.load_nogoods(plans) if self._nogoods else None
+        processes = self._processes or os.cpu_count()
+
+        if not os.path.isdir(self._output_path):
+            os.makedirs(self._output_path)
+        with open(self.manifest_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+            # The pool is only restarted if a job times out. Workers of a new
+            # pool start from all nogoods learned so far.
+            while jobs:
+                nogood_data = None
+                if stores is not None:
+                    nogood_data = {
+                        grid_path: store.to_data()
+                        for grid_path, store in stores.items()
+                    }
+                init_args = (
+                    plan_data,
+                    self._budget,
+                    self._profiles,
+                    self._output_path,
+                    self._draw,
+                    self._scale,
+                    nogood_data
+                )
+                with multiprocessing.Pool(processes, _init_worker, init_args) as pool:
+                    for record, data in self.run_pool(pool, processes, jobs):
+                        if data:
+                            stores[record['grid']].update(data)
+                        logger.info('%s: %s %s', record['status'], record['grid'], record['seed'])
+                        f.write(json.dumps(record) + '\n')
+                        f.flush()
+                        records.append(record)
+
+        if stores is not None:
+            for grid_path, store in stores.items():
+                store.save(get_nogood_path(self._output_path, grid_path))
+        return records
@@ -0,0 +1,71 @@
+import networkx as nx
+
+from reactor.blocks.edgeblock import EdgeBlock
+from reactor.blocks.faceblock import FaceBlock
+from reactor.faceanalysis import FaceAnalysis
+
+
+def get_blocks(g):
+    """
+    Split the given graph into blocks. Each biconnected component becomes a
+    face block per face, or an edge block if it's a single edge.
+
+    """
+    blocks = []
+    for biconn in nx.biconnected_components(g):
+        sg = g.subgraph(biconn)
+        if len(biconn) < 3:
+            blocks.append(EdgeBlock(sg))
+        else:
+            for face in FaceAnalysis(sg).get_faces():
+                fsg = g.subgraph(face)
+                blocks.append(FaceBlock.from_path(face, fsg))
+    return blocks
+
+
+def get_adjacent_blocks(blocks):
+    """
+    Yield each pair of adjacent blocks. Two faces are adjacent if they share
+    an edge, which each face runs in the opposite direction. Any other pair of
+    blocks is adjacent if they share a node.
+
+    Blocks are indexed by node and by half-edge, so only blocks that share
+    something are compared. Pairs are yielded in the same order as testing
+    every combination of blocks would.
+
+    """
+    is_face = [isinstance(block, FaceBlock) for block in blocks]
+    node_index = {}
+    half_edge_index = {}
+    for i, block in enumerate(blocks):
+        for node in block:
+            node_index.setdefault(node, []).append(i)
+        if is_face[i]:
+            for edge in block.edges:
+                half_edge_index.setdefault(edge, []).append(i)
+
+    for i, block in enumerate(blocks):
+        adjacent = set()
+        for node in block:
+            adjacent.update(
+                j for j in node_index[node]
+                if not (is_face[i] and is_face[j])
+            )
+        if is_face[i]:
+            for u, v in block.edges:
+                adjacent.update(half_edge_index.get((v, u), ()))
+        for j in sorted(j for j in adjacent if j > i):
+            yield block, blocks[j]
+
+
+def build_block_graph(g):
+    """
+    Build the undirected graph of the blocks of the given graph and their
+    adjacencies.
+
+    """
+    bg = nx.Graph()
+    blocks = get_blocks(g)
+    bg.add_nodes_from(blocks)
+    bg.add_edges_from(get_adjacent_blocks(blocks))
+    return bg
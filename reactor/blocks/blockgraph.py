@@ -1,5 +1,6 @@
-import networkx as nx
+import random
 
+import networkx as nx
 
 from reactor.layouters.edgelayouter import EdgeLayouter
 from reactor.layouters.facelayouter import FaceLayouter
@@ -12,8 +13,46 @@ LAYOUTER = 'layouter'
 
 class BlockGraph(nx.DiGraph):
 
+    def __init__(
+        self,
+        *args,
+        rng=random,
+        angle_hints=None,
+        profiles=None,
+        **kwargs
+    ):
+        super(BlockGraph, self).__init__(*args, **kwargs)
+
+        # Random generator, optional angle hints and edge profiles shared by
+        # the block layouters.
+        self.rng = rng
+        self.angle_hints = angle_hints
+        self.profiles = profiles
+
+        # Layout order index. Built once the graph is complete.
+        self.blocks = None
+        self.positions = None
+        self.parent_positions = None
+
+    def build_index(self):
+        """
+        Record the position of every block in layout order, which is the BFS
+        order the blocks were added in, along with the position of each
+        block's parent. The root's parent position is None.
+
+        """
+        self.blocks = list(self)
+        self.positions = {block: i for i, block in enumerate(self.blocks)}
+        self.parent_positions = [
+            self.positions.get(next(self.predecessors(block), None))
+            for block in self.blocks
+        ]
+
     def parent(self, node):
-        return next(self.predecessors(node), None)
+        if self.positions is None:
+            return next(self.predecessors(node), None)
+        parent_position = self.parent_positions[self.positions[node]]
+        return self.blocks[parent_position] if parent_position is not None else None
 
     def get_layouter(self, node):
         if self.nodes[node].get(LAYOUTER) is None:
@@ -26,5 +65,5 @@ class BlockGraph(nx.DiGraph):
                 cls = EdgeLayouter
             else:
                 cls = RootLayouter
-            self.nodes[node][LAYOUTER] = cls(node, self)
+            self.nodes[node][LAYOUTER] = cls(node, self, self.rng)
         return self.nodes[node][LAYOUTER]
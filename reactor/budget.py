@@ -0,0 +1,92 @@
+import enum
+import time
+
+
+class LayoutStatus(enum.Enum):
+
+    COMPLETE = 'complete'
+    TIME_EXHAUSTED = 'time_exhausted'
+    PERMUTATIONS_EXHAUSTED = 'permutations_exhausted'
+    BACKTRACKS_EXHAUSTED = 'backtracks_exhausted'
+
+
+class Budget(object):
+
+    """
+    Limits on a layout search. Any limit left as None is unbounded.
+
+    max_time: Wall-clock seconds.
+    max_permutations: Number of permutations tested for collisions.
+    max_backtracks: Number of times the search jumps back to an earlier block.
+
+    """
+
+    def __init__(self, max_time=None, max_permutations=None, max_backtracks=None):
+        self.max_time = max_time
+        self.max_permutations = max_permutations
+        self.max_backtracks = max_backtracks
+
+    def get_status(self, elapsed, num_permutations, num_backtracks):
+        """
+        Return the status for the first limit that has been reached, or None
+        if the search can carry on.
+
+        """
+        if self.max_time is not None and elapsed >= self.max_time:
+            return LayoutStatus.TIME_EXHAUSTED
+        if self.max_permutations is not None and num_permutations >= self.max_permutations:
+            return LayoutStatus.PERMUTATIONS_EXHAUSTED
+        if self.max_backtracks is not None and num_backtracks >= self.max_backtracks:
+            return LayoutStatus.BACKTRACKS_EXHAUSTED
+        return None
+
+
+class LayoutResult(object):
+
+    def __init__(self, status, num_blocks, num_placed, num_permutations, num_backtracks, elapsed):
+        self.status = status
+        self.num_blocks = num_blocks
+        self.num_placed = num_placed
+        self.num_permutations = num_permutations
+        self.num_backtracks = num_backtracks
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return '<{} status={} placed={}/{} permutations={} backtracks={} elapsed={:.3f}>'.format(
+            self.__class__.__name__,
+            self.status.value,
+            self.num_placed,
+            self.num_blocks,
+            self.num_permutations,
+            self.num_backtracks,
+            self.elapsed,
+        )
+
+    @property
+    def complete(self):
+        return self.status == LayoutStatus.COMPLETE
+
+
+class SearchMonitor(object):
+
+    """
+    Tracks the counters for a single search against a budget.
+
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget or Budget()
+        self.num_permutations = 0
+        self.num_backtracks = 0
+        self._start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def get_status(self):
+        return self.budget.get_status(
+            self.elapsed,
+            self.num_permutations,
+            self.num_backtracks
+        )
@@ -2,6 +2,7 @@ import enum
 
 
 ANGLE = 'angle'
+BLOCK = 'block'
 DIRECTION = 'direction'
 POSITION = 'position'
 LENGTH = 'length'
@@ -29,11 +30,11 @@ class Direction(enum.IntEnum):
 
     @staticmethod
     def normalise(direction):
-        return Direction(direction % 4)
+        return DIRECTIONS[direction % 4]
 
     @staticmethod
     def opposite(direction):
-        return Direction.normalise(direction - 2)
+        return OPPOSITE_DIRECTIONS[direction % 4]
 
     @staticmethod
     def xs():
@@ -42,3 +43,17 @@ class Direction(enum.IntEnum):
     @staticmethod
     def ys():
         return Direction.UP, Direction.DOWN
+
+
+# Lookup tables for hot loops, to save constructing enums. Directions are
+# indexed by their value modulo 4, steps are unit (x, y) offsets per
+# direction and turns give the direction after turning through an angle.
+DIRECTIONS = tuple(Direction)
+OPPOSITE_DIRECTIONS = tuple(DIRECTIONS[(d + 2) % 4] for d in DIRECTIONS)
+DIRECTION_STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+ANGLE_TURNS = {Angle.INSIDE: 1, Angle.STRAIGHT: 0, Angle.OUTSIDE: -1}
+TURNS = {
+    (direction, angle): DIRECTIONS[(direction + turn) % 4]
+    for direction in DIRECTIONS
+    for angle, turn in ANGLE_TURNS.items()
+}
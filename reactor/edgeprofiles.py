@@ -0,0 +1,96 @@
+from collections import namedtuple
+
+from reactor.const import WEIGHT, WIDTH
+
+
+DEFAULT_WEIGHT = 1
+
+
+EdgeProfile = namedtuple('EdgeProfile', (
+    'width',
+    'lengths',
+    'room_widths',
+    'room_heights',
+    'room_chance',
+))
+
+
+def parse_weight(value):
+    """
+    Return the given edge weight as an int. Weights index edge profiles so
+    they must be whole numbers, eg 2 or 2.0, and anything else raises a
+    ValueError rather than being rounded to a different profile.
+
+    """
+    weight = float(value)
+    if not weight.is_integer():
+        raise ValueError(f'Edge weight must be a whole number: {value}')
+    return int(weight)
+
+
+class EdgeProfiles(tuple):
+
+    """
+    Immutable table of edge settings compiled from an EDGE_WEIGHTS style dict
+    and indexed by edge weight. Length and room size ranges are expanded to
+    tuples once up front, so drawing a random length is a single choice
+    rather than a settings lookup and range calculation per edge.
+
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_settings(cls, edge_weights=None):
+        if edge_weights is None:
+            from simple_settings import settings
+            edge_weights = settings.EDGE_WEIGHTS
+        profiles = [None] * (max(edge_weights) + 1)
+        for weight, edge_settings in edge_weights.items():
+            profiles[weight] = EdgeProfile(
+                width=edge_settings.get(WIDTH, 1),
+                lengths=tuple(range(
+                    edge_settings['MIN_LENGTH'],
+                    edge_settings['MAX_LENGTH'] + 1,
+                    edge_settings['STEP_LENGTH']
+                )),
+                room_widths=tuple(range(
+                    edge_settings['ROOM_MIN_WIDTH'],
+                    edge_settings['ROOM_MAX_WIDTH']
+                )),
+                room_heights=tuple(range(
+                    edge_settings['ROOM_MIN_HEIGHT'],
+                    edge_settings['ROOM_MAX_HEIGHT']
+                )),
+                room_chance=edge_settings['ROOM_CHANCE'],
+            )
+        return cls(profiles)
+
+    def get_profile(self, weight):
+        """
+        Return the profile for the given weight, or raise a ValueError if no
+        profile is defined for it.
+
+        """
+        profile = self[weight] if 0 <= weight < len(self) else None
+        if profile is None:
+            raise ValueError(f'No edge profile for weight: {weight}')
+        return profile
+
+    def get_edge_profile(self, g, edge):
+        return self.get_profile(g.edges[edge].get(WEIGHT, DEFAULT_WEIGHT))
+
+
+_default_profiles = None
+
+
+def get_default_profiles():
+    """
+    Return the profiles compiled from the project settings. These are compiled
+    on first use, as settings may not be configured at import time.
+
+    """
+    global _default_profiles
+    if _default_profiles is None:
+        _default_profiles = EdgeProfiles.from_settings()
+    return _default_profiles
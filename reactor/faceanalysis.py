@@ -1,14 +1,59 @@
 import math
+import threading
+import warnings
+from collections import OrderedDict
 
 import networkx as nx
 
 from reactor.const import POSITION
 
 
+CACHE_SIZE = 256
+
+
+# Face analysis results keyed by graph content, so that the faces of a graph
+# are only found once per process no matter how many times it's laid out. The
+# least recently used result is evicted when full. The lock guards the cache
+# when faces are found from several threads.
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _get_cached(key):
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _set_cached(key, result):
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
 class FaceAnalysis(object):
 
-    def __init__(self, g, do_layout=False):
+    """
+    Find the faces of a planar biconnected graph. The embedding is taken from
+    node positions if every node has one, falling back to a combinatorial
+    embedding from the planarity test if they don't or if they don't describe
+    a planar embedding. Set use_positions to False to always use the latter.
+
+    """
+
+    def __init__(self, g, do_layout=False, use_positions=True, use_cache=True):
         self._do_layout = do_layout
+        self._use_positions = use_positions
+        self._use_cache = use_cache
         self._visited = set()
 
         self._g = g
@@ -50,7 +95,51 @@ class FaceAnalysis(object):
         else:
             return nx.planar_layout(self.g)
 
+    def _has_positions(self):
+        return self._use_positions and all(node in self.pos for node in self.g)
+
+    def _get_cache_key(self):
+        """
+        Return a key describing the content of the graph, ie its nodes, edges
+        and, if they're used for the embedding, the node positions.
+
+        """
+        if self._has_positions():
+            nodes = frozenset(
+                (node, float(self.pos[node][0]), float(self.pos[node][1]))
+                for node in self.g
+            )
+        else:
+            nodes = frozenset(self.g)
+        edges = frozenset(frozenset(edge) for edge in self.g.edges)
+        return nodes, edges, self._has_positions()
+
     def _calculate_planar_embedding(self):
+        """
+        Return a planar embedding for the graph, using the node positions if
+        they describe one.
+
+        """
+        if self._has_positions():
+            try:
+                return self._calculate_geometric_embedding()
+            except nx.NetworkXException:
+                warnings.warn('Node positions are not planar, ignoring them')
+                self._pos = {}
+        return self._calculate_combinatorial_embedding()
+
+    def _calculate_combinatorial_embedding(self):
+        """
+        Return the planar embedding found by the planarity test. This has no
+        notion of which face is exterior.
+
+        """
+        is_planar, emd = nx.check_planarity(self.g)
+        if not is_planar:
+            raise nx.NetworkXException('Graph is not planar')
+        return emd
+
+    def _calculate_geometric_embedding(self):
         """
         Return a planar embedding for the graph, using the planar layout
         calculated previously. If the previous layout step has not resulted in a
@@ -80,9 +169,18 @@ class FaceAnalysis(object):
         """
         Return a half-edge on the external face. We do this by selecting a node
         in the bottom left corner, then an adjacent node with the maximal cosine
-        value.
+        value. Without positions the longest face is taken as the exterior.
 
         """
+        if not self._has_positions():
+            visited = set()
+            faces = [
+                self.embedding.traverse_face(*edge, mark_half_edges=visited)
+                for edge in self.embedding.edges
+                if edge not in visited
+            ]
+            face = max(faces, key=len)
+            return face[0], face[1]
         corner = min(self.pos, key=lambda n: tuple(self.pos[n]))
         other = max(
             self.g.adj[corner], key=lambda node:
@@ -124,7 +222,23 @@ class FaceAnalysis(object):
 
     def get_faces(self):
         self._pos = self._calculate_node_positions()
-        self._embedding = self._calculate_planar_embedding()
-        self._ext_hedge = self._calculate_external_face_half_edge()
-        self._ext_face = self._calculate_exterior_face()
-        return self._calculate_interior_faces()
\ No newline at end of file
+        key = self._get_cache_key() if self._use_cache else None
+        result = _get_cached(key) if key is not None else None
+        if result is None:
+            self._embedding = self._calculate_planar_embedding()
+            self._ext_hedge = self._calculate_external_face_half_edge()
+            self._ext_face = self._calculate_exterior_face()
+            faces = tuple(self._calculate_interior_faces())
+
+            # The embedding is mutable, so the cache keeps its own copy.
+            if key is not None:
+                _set_cached(key, (
+                    self._embedding.copy(),
+                    self._ext_hedge,
+                    self._ext_face,
+                    faces
+                ))
+        else:
+            embedding, self._ext_hedge, self._ext_face, faces = result
+            self._embedding = embedding.copy()
+        return list(faces)
\ No newline at end of file
@@ -0,0 +1,48 @@
+from operator import itemgetter
+
+
+class Point2(tuple):
+
+    """
+    Immutable 2D point. Much cheaper to create than a Vector2 as it's a plain
+    tuple rather than an ndarray, so it's used for the positions and steps
+    built in the layout's hot loops. Arithmetic accepts any 2D sequence,
+    including Vector2.
+
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, x, y):
+        return tuple.__new__(cls, (x, y))
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self[0], self[1])
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
+
+    def __add__(self, other):
+        return Point2(self[0] + other[0], self[1] + other[1])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Point2(self[0] - other[0], self[1] - other[1])
+
+    def __rsub__(self, other):
+        return Point2(other[0] - self[0], other[1] - self[1])
+
+    def __mul__(self, scalar):
+        return Point2(self[0] * scalar, self[1] * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return Point2(self[0] / scalar, self[1] / scalar)
+
+    def __neg__(self):
+        return Point2(-self[0], -self[1])
@@ -1,11 +1,14 @@
+from operator import itemgetter
+
+from reactor.geometry.point import Point2
 from reactor.geometry.vector import Vector2
 
 
-class Rect(object):
+class RectBase(object):
 
-    def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
+    """Read-only rect queries shared by mutable and frozen rects."""
+
+    __slots__ = ()
 
     def __str__(self):
         return '{}, {}'.format(self.p1, self.p2)
@@ -38,6 +41,16 @@ class Rect(object):
             self.p2.y >= other.p1.y
         )
 
+    def contains_point(self, p):
+        return self.p1.x <= p.x <= self.p2.x and self.p1.y <= p.y <= self.p2.y
+
+
+class Rect(RectBase):
+
+    def __init__(self, p1, p2):
+        self.p1 = p1
+        self.p2 = p2
+
     def normalise(self):
         x1, y1 = self.p1
         x2, y2 = self.p2
@@ -54,5 +67,37 @@ class Rect(object):
         self.p2.x += d
         self.p2.y += d
 
-    def contains_point(self, p):
-        return self.p1.x <= p.x <= self.p2.x and self.p1.y <= p.y <= self.p2.y
+
+class FrozenRect(RectBase, tuple):
+
+    """
+    Immutable rect of two Point2 corners. Methods that would modify a Rect in
+    place return a new rect instead.
+
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, p1, p2):
+        return tuple.__new__(cls, (p1, p2))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    p1 = property(itemgetter(0))
+    p2 = property(itemgetter(1))
+
+    @classmethod
+    def from_points(cls, p1, p2):
+        """Return a normalised rect spanning the two given points."""
+        x1, y1 = p1
+        x2, y2 = p2
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+        return cls(Point2(x1, y1), Point2(x2, y2))
+
+    def inflated(self, d):
+        (x1, y1), (x2, y2) = self
+        return self.__class__(Point2(x1 - d, y1 - d), Point2(x2 + d, y2 + d))
@@ -0,0 +1,172 @@
+import numpy as np
+
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect
+
+
+DEFAULT_CAPACITY = 16
+
+
+class RectSet(object):
+
+    """
+    A keyed collection of normalised rects backed by an (N, 4) array of
+    (x1, y1, x2, y2) rows, for testing many rects at once.
+
+    Queries take either a single rect, in which case they return a mask of
+    shape (N,), or many rects as another RectSet, an (M, 4) array or an
+    iterable of rects, in which case they return a mask of shape (N, M).
+
+    Rects are removed by moving the last row into the freed slot, so row order
+    is not stable. Use keys to identify rects.
+
+    """
+
+    def __init__(self, rects=(), keys=None, capacity=DEFAULT_CAPACITY):
+        self._array = np.zeros((capacity, 4), dtype=np.float64)
+        self._keys = []
+        self._indices = {}
+        self._next_key = 0
+        self.extend(rects, keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._indices
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    @property
+    def array(self):
+        return self._array[:len(self._keys)]
+
+    @property
+    def keys(self):
+        return list(self._keys)
+
+    @staticmethod
+    def rect_to_row(rect):
+        return rect.p1.x, rect.p1.y, rect.p2.x, rect.p2.y
+
+    @classmethod
+    def to_array(cls, rects):
+        """
+        Coerce the given rect or rects to an array. A single rect becomes an
+        array of shape (4,), anything else an array of shape (M, 4).
+
+        """
+        if isinstance(rects, cls):
+            return rects.array
+        if hasattr(rects, 'p1'):
+            return np.array(cls.rect_to_row(rects), dtype=np.float64)
+        if isinstance(rects, np.ndarray):
+            return rects.astype(np.float64, copy=False)
+        rows = [cls.rect_to_row(rect) for rect in rects]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), 4)
+
+    def _broadcast(self, rects):
+        other = self.to_array(rects)
+        if other.ndim == 1:
+            return self.array, other
+        return self.array[:, None, :], other[None, :, :]
+
+    def get(self, key):
+        x1, y1, x2, y2 = self._array[self._indices[key]]
+        return FrozenRect(Point2(x1, y1), Point2(x2, y2))
+
+    def get_index(self, key):
+        return self._indices[key]
+
+    def append(self, rect, key=None):
+        """
+        Add a rect under the given key, which defaults to a running count of
+        rects appended. If the key already exists its rect is replaced.
+
+        """
+        if key is None:
+            key = self._next_key
+            self._next_key += 1
+        index = self._indices.get(key)
+        if index is None:
+            index = len(self._keys)
+            if index == len(self._array):
+                grown = np.zeros((len(self._array) * 2, 4), dtype=np.float64)
+                grown[:index] = self._array
+                self._array = grown
+            self._keys.append(key)
+            self._indices[key] = index
+        self._array[index] = self.rect_to_row(rect)
+
+    def extend(self, rects, keys=None):
+        rects = list(rects)
+        keys = keys if keys is not None else [None] * len(rects)
+        for rect, key in zip(rects, keys):
+            self.append(rect, key)
+
+    def remove(self, key):
+        index = self._indices.pop(key, None)
+        if index is None:
+            return
+        last = len(self._keys) - 1
+        if index != last:
+            last_key = self._keys[last]
+            self._array[index] = self._array[last]
+            self._keys[index] = last_key
+            self._indices[last_key] = index
+        self._keys.pop()
+
+    def clear(self):
+        self._keys.clear()
+        self._indices.clear()
+
+    def translate(self, dx, dy):
+        self.array[:] += (dx, dy, dx, dy)
+
+    def intersects(self, rects):
+        a, b = self._broadcast(rects)
+        return (
+            (a[..., 0] < b[..., 2]) &
+            (a[..., 2] > b[..., 0]) &
+            (a[..., 1] < b[..., 3]) &
+            (a[..., 3] > b[..., 1])
+        )
+
+    def touches(self, rects):
+        a, b = self._broadcast(rects)
+        return (
+            (a[..., 0] <= b[..., 2]) &
+            (a[..., 2] >= b[..., 0]) &
+            (a[..., 1] <= b[..., 3]) &
+            (a[..., 3] >= b[..., 1])
+        )
+
+    def contains_points(self, points):
+        """
+        Return a mask of which rects contain the given point, or of shape
+        (N, M) for an (M, 2) array of points.
+
+        """
+        points = np.asarray(points, dtype=np.float64)
+        a = self.array if points.ndim == 1 else self.array[:, None, :]
+        return (
+            (a[..., 0] <= points[..., 0]) &
+            (points[..., 0] <= a[..., 2]) &
+            (a[..., 1] <= points[..., 1]) &
+            (points[..., 1] <= a[..., 3])
+        )
+
+    def get_intersecting_pairs(self, rects):
+        """
+        Return the row indices of the intersecting rects of this set and the
+        given rects as two arrays.
+
+        """
+        mask = self.intersects(rects)
+        if mask.ndim == 1:
+            mask = mask[:, None]
+        return np.nonzero(mask)
+
+    def get_intersecting_keys(self, rect):
+        return [self._keys[i] for i in np.flatnonzero(self.intersects(rect))]
@@ -0,0 +1,78 @@
+import math
+from collections import defaultdict
+
+
+DEFAULT_CELL_SIZE = 4
+
+
+class SpatialHash(object):
+
+    """
+    Uniform grid over the plane that buckets keys by the cells their rects
+    cover. Queries return candidate keys only - callers are still expected to
+    run an exact intersection test against the candidates.
+
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)
+        self._key_cells = {}
+
+    def __len__(self):
+        return len(self._key_cells)
+
+    def __contains__(self, key):
+        return key in self._key_cells
+
+    def _get_cells(self, rect):
+        x1 = math.floor(rect.p1.x / self.cell_size)
+        y1 = math.floor(rect.p1.y / self.cell_size)
+        x2 = math.floor(rect.p2.x / self.cell_size)
+        y2 = math.floor(rect.p2.y / self.cell_size)
+        return [
+            (x, y)
+            for x in range(x1, x2 + 1)
+            for y in range(y1, y2 + 1)
+        ]
+
+    def insert(self, key, rect):
+        """
+        Insert the key into all cells covered by the given normalised rect. If
+        the key already exists it is moved.
+
+        """
+        self.remove(key)
+        cells = self._get_cells(rect)
+        for cell in cells:
+            self._cells[cell].add(key)
+        self._key_cells[key] = cells
+
+    def remove(self, key):
+        for cell in self._key_cells.pop(key, ()):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def copy(self):
+        index = self.__class__(self.cell_size)
+        for cell, keys in self._cells.items():
+            index._cells[cell] = set(keys)
+        index._key_cells = dict(self._key_cells)
+        return index
+
+    def clear(self):
+        self._cells.clear()
+        self._key_cells.clear()
+
+    def query(self, rect):
+        """
+        Return the set of keys that share at least one cell with the given
+        normalised rect.
+
+        """
+        keys = set()
+        for cell in self._get_cells(rect):
+            keys.update(self._cells.get(cell, ()))
+        return keys
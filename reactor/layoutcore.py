@@ -0,0 +1,170 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect
+from reactor.geometry.spatialhash import SpatialHash
+
+
+DEFAULT_CAPACITY = 64
+
+NO_DIRECTION = -1
+
+
+class LayoutCore(object):
+
+    """
+    Flat array storage for the geometry of a layout. Node and edge keys are
+    interned to integer ids which index preallocated arrays of node positions
+    and edge endpoints, directions, lengths, weights and rects. Arrays double
+    in size as they fill, and ids freed by removals are reused.
+
+    Rows for removed ids are left in place, so arrays must be read through the
+    ids returned by get_edge_ids.
+
+    The core is the only store of edge rects in a layout. It also keeps the
+    broad-phase spatial index of them, which is updated alongside the arrays
+    so the two can't drift apart.
+
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.node_ids = {}
+        self.nodes = []
+        self._free_node_ids = []
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+
+        self.edge_ids = {}
+        self.edges = []
+        self._free_edge_ids = []
+        self.edge_nodes = np.full((capacity, 2), -1, dtype=np.int64)
+        self.directions = np.full(capacity, NO_DIRECTION, dtype=np.int8)
+        self.lengths = np.full(capacity, np.nan, dtype=np.float64)
+        self.weights = np.ones(capacity, dtype=np.int64)
+        self.rects = np.zeros((capacity, 4), dtype=np.float64)
+        self.edge_mask = np.zeros(capacity, dtype=bool)
+        self.index = SpatialHash()
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_ids)
+
+    @staticmethod
+    def _grow(array, size):
+        if len(array) >= size:
+            return array
+        capacity = len(array)
+        while capacity < size:
+            capacity *= 2
+        grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _intern_node(self, node):
+        node_id = self.node_ids.get(node)
+        if node_id is not None:
+            return node_id
+        if self._free_node_ids:
+            node_id = self._free_node_ids.pop()
+            self.nodes[node_id] = node
+        else:
+            node_id = len(self.nodes)
+            self.nodes.append(node)
+            self.positions = self._grow(self.positions, node_id + 1)
+        self.node_ids[node] = node_id
+        return node_id
+
+    def set_node_position(self, node, pos):
+
+        # Intern first - it may grow the positions array.
+        node_id = self._intern_node(node)
+        self.positions[node_id] = pos[0], pos[1]
+
+    def get_node_position(self, node):
+        return self.positions[self.node_ids[node]]
+
+    def remove_node(self, node):
+        node_id = self.node_ids.pop(node, None)
+        if node_id is not None:
+            self.nodes[node_id] = None
+            self._free_node_ids.append(node_id)
+
+    def set_edge(self, edge, rect, direction=None, length=None, weight=1):
+        edge_id = self.edge_ids.get(edge)
+        if edge_id is None:
+            if self._free_edge_ids:
+                edge_id = self._free_edge_ids.pop()
+                self.edges[edge_id] = edge
+            else:
+                edge_id = len(self.edges)
+                self.edges.append(edge)
+                self._grow_edges(edge_id + 1)
+            self.edge_ids[edge] = edge_id
+        self.edge_nodes[edge_id] = [self._intern_node(node) for node in edge]
+        self.directions[edge_id] = NO_DIRECTION if direction is None else direction
+        self.lengths[edge_id] = np.nan if length is None else length
+        self.weights[edge_id] = weight
+        self.rects[edge_id] = rect.p1.x, rect.p1.y, rect.p2.x, rect.p2.y
+        self.edge_mask[edge_id] = True
+        self.index.insert(edge, rect)
+
+    def _grow_edges(self, size):
+        old_size = len(self.edge_mask)
+        self.edge_nodes = self._grow(self.edge_nodes, size)
+        self.directions = self._grow(self.directions, size)
+        self.lengths = self._grow(self.lengths, size)
+        self.weights = self._grow(self.weights, size)
+        self.rects = self._grow(self.rects, size)
+        self.edge_mask = self._grow(self.edge_mask, size)
+        self.edge_mask[old_size:] = False
+
+    def remove_edge(self, edge):
+        edge_id = self.edge_ids.pop(edge, None)
+        if edge_id is not None:
+            self.edges[edge_id] = None
+            self.edge_mask[edge_id] = False
+            self._free_edge_ids.append(edge_id)
+            self.index.remove(edge)
+
+    def get_edge_rect(self, edge):
+        x1, y1, x2, y2 = self.rects[self.edge_ids[edge]].tolist()
+        return FrozenRect(Point2(x1, y1), Point2(x2, y2))
+
+    def get_edge_ids(self):
+        return np.flatnonzero(self.edge_mask[:len(self.edges)])
+
+    def copy(self):
+        core = self.__class__.__new__(self.__class__)
+        core.__dict__.update({
+            key: value.copy() if hasattr(value, 'copy') else value
+            for key, value in self.__dict__.items()
+        })
+        return core
+
+
+class EdgeRectView(Mapping):
+
+    """
+    Read-only mapping of edge to rect over the rows of a layout core.
+
+    """
+
+    def __init__(self, core):
+        self._core = core
+
+    def __getitem__(self, edge):
+        return self._core.get_edge_rect(edge)
+
+    def __contains__(self, edge):
+        return edge in self._core.edge_ids
+
+    def __iter__(self):
+        return iter(list(self._core.edge_ids))
+
+    def __len__(self):
+        return self._core.num_edges
@@ -1,20 +1,47 @@
+import functools
 import itertools as it
+import logging
 import random
 
 import networkx as nx
+import numpy as np
 
+from reactor.anglehints import AngleHints
 from reactor.blocks.blockgraph import BlockGraph
-from reactor.blocks.edgeblock import EdgeBlock
+from reactor.blocks.blockbuilder import build_block_graph
 from reactor.blocks.faceblock import FaceBlock
 from reactor.blocks.rootblock import RootBlock
-from reactor.faceanalysis import FaceAnalysis
+from reactor.budget import LayoutResult, LayoutStatus, SearchMonitor
+from reactor.const import BLOCK
+from reactor.layouters.permutationstream import PermutationStream
+
+
+logger = logging.getLogger(__name__)
 
 
 class Layouter(object):
 
-    def __init__(self, g, map_):
+    def __init__(
+        self,
+        g,
+        map_,
+        batch_collisions=True,
+        nogoods=None,
+        budget=None,
+        rng=random,
+        angle_prepass=False,
+        profiles=None,
+        block_graph=None
+    ):
         self._g = g
         self._map = map_
+        self._batch_collisions = batch_collisions
+        self._nogoods = nogoods
+        self._budget = budget
+        self._rng = rng
+        self._angle_prepass = angle_prepass
+        self._profiles = profiles
+        self._block_graph = block_graph
 
     @property
     def g(self):
@@ -31,7 +58,7 @@ class Layouter(object):
         return sorted(nodes, key=lambda n: (len(n) < 3, len(n), sorted(n)))
 
     def bfs_tree(self, g, source, reverse=False, depth_limit=None, sort_neighbors=None):
-        t = BlockGraph()
+        t = BlockGraph(rng=self._rng, profiles=self._profiles)
         t.add_node(source)
         edges_gen = nx.bfs_edges(
             g,
@@ -47,23 +74,9 @@ class Layouter(object):
     # method.
     def get_block_graph(self):
 
-        # Split the input graph into biconnected components. Each biconn will
-        # become a node in the block graph.
-        g = nx.Graph()
-
-        # Build nodes.
-        for biconn in nx.biconnected_components(self.g):
-            sg = self.g.subgraph(biconn)
-            if len(biconn) < 3:
-                g.add_node(EdgeBlock(sg))
-            else:
-                for face in FaceAnalysis(sg).get_faces():
-                    fsg = self.g.subgraph(face)
-                    g.add_node(FaceBlock.from_path(face, fsg))
-
-        # Build edges.
-        edges = filter(lambda x: x[0].is_adjacent(x[1]), it.combinations(g, 2))
-        g.add_edges_from(edges)
+        # Split the input graph into faces and edges, connected where they're
+        # adjacent.
+        g = build_block_graph(self.g)
 
         # Find root node.
         sorted_nodes = self._sort_nodes(g)
@@ -79,14 +92,95 @@ class Layouter(object):
         g = self.bfs_tree(g, super_root, sort_neighbors=self._sort_nodes)
 
         # Sort nodes.
+        g.build_index()
         for node in g:
             p_node = g.parent(node)
             node.sort(p_node)
 
         return g
 
-    def bfs(self, g):
-        blocks = list(g)
+    def get_constraining_blocks(self, g, block):
+        """
+        Return the set of placed blocks that determine the permutations of the
+        given block, ie its parent and the owners of any laid out edge that
+        touches it. These fix the block's start position, directions, known
+        edge lengths and angles.
+
+        """
+        layout = self._map.layout
+        blocks = set()
+        parent = g.parent(block)
+        if parent is not None:
+            blocks.add(parent)
+        edges = it.chain(layout.in_edges(block.nodes), layout.out_edges(block.nodes))
+        for edge in edges:
+            blocks.add(layout.edges[edge][BLOCK])
+        return blocks
+
+    def _mask_permutations(self, layouter, g, monitor, perms):
+        """
+        Batched collision test of the given permutations. For each permutation
+        that collides, the earliest placed culprit is added to the layouter's
+        conflict set.
+
+        """
+        # Out of budget. Let the batch through untested so that the main loop
+        # sees the status straight away, rather than the stream building more
+        # batches looking for one that passes.
+        if monitor.get_status() is not None:
+            return np.ones(len(perms), dtype=bool)
+
+        edges, collisions = layouter.get_collision_matrix(perms, self._map)
+        collides = collisions.any(axis=1)
+
+        # Permutations that pass are counted when they're tested again in the
+        # main loop.
+        monitor.num_permutations += int(collides.sum())
+        if collides.any():
+            layout = self._map.layout
+            edge_indices = np.array([
+                g.positions[layout.edges[edge][BLOCK]] for edge in edges
+            ])
+            culprit_indices = np.where(
+                collisions[collides],
+                edge_indices,
+                len(g.blocks)
+            ).min(axis=1)
+            layouter.conflicts.update(g.blocks[i] for i in set(culprit_indices))
+        return ~collides
+
+    def unwind(self, g, target, i):
+        """
+        Roll the layout back to before the target block was placed, and mark
+        the blocks from the target up to block i as not done. All but the
+        target have their permutations removed. Blocks past block i haven't
+        been visited since they were last reset.
+
+        """
+        self._map.layout.rollback(g.get_layouter(g.blocks[target]).checkpoint)
+        for j in reversed(range(target, i + 1)):
+            layouter = g.get_layouter(g.blocks[j])
+            layouter.done = False
+            if j != target:
+                layouter.permutations = None
+                layouter.conflicts = set()
+
+    def bfs(self, g, monitor=None):
+        """
+        Lay out the blocks of the given block graph in order. If the monitor's
+        budget runs out the search stops and the layout is left holding the
+        best partial layout found, ie the one with the most blocks placed.
+        Returns the number of blocks placed and the search status.
+
+        """
+        if monitor is None:
+            monitor = SearchMonitor()
+        best_layout = None
+        best_placed = 0
+        if g.positions is None:
+            g.build_index()
+        blocks = g.blocks
+        indices = g.positions
         #print('blocks:')
         #for b in blocks:
         #    #print('    ->', b)
@@ -94,6 +188,10 @@ class Layouter(object):
         i = 0
         while i < len(blocks):
 
+            status = monitor.get_status()
+            if status is not None:
+                break
+
             layouter = g.get_layouter(blocks[i])
             if layouter.done:
                 #print('SKIPPING AS DONE:', blocks[i])
@@ -101,24 +199,54 @@ class Layouter(object):
                 continue
 
             #print('process ->', i, blocks[i], 'parent:', g.parent(blocks[i]))
-            if not layouter.permutations:# is None:
+            if layouter.permutations is None:
                 #print('    creating new perms')
-                #try:
-                layouter.permutations = layouter.get_permutations(self._map.layout)
-                # except:
-                #     from reactor import utils
-                #     pos = nx.get_node_attributes(self.layout, POSITION)
-                #     utils.draw_graph(self.layout, pos)
-                #     raise
-                random.shuffle(layouter.permutations)
+                layouter.conflicts = self.get_constraining_blocks(g, blocks[i])
+
+                # If the block is known to fail in this context then don't
+                # bother creating permutations. Jump straight back to the
+                # blocks that caused the failure last time.
+                culprits = None
+                if self._nogoods is not None:
+                    culprits = self._nogoods.find(blocks[i], self._map.layout)
+                if culprits is not None:
+                    #print('    NOGOOD:', blocks[i])
+                    layouter.permutations = PermutationStream((), None)
+                    layouter.conflicts.update(
+                        self._map.layout.edges[edge][BLOCK]
+                        for edge in culprits
+                    )
+                else:
+                    layouter.permutations = layouter.get_permutations(self._map.layout)
+
+                # Filter out permutations that collide with the layout in
+                # batches as they're built. Blocks before this one are never
+                # removed while its permutations are live, so anything
+                # colliding now will always collide.
+                if self._batch_collisions:
+                    layouter.permutations.mask_func = functools.partial(
+                        self._mask_permutations,
+                        layouter,
+                        g,
+                        monitor
+                    )
             #else:
                 #print('    using existing perms')
 
-            while layouter.permutations:
-                perm = layouter.permutations.pop(0)
-                if not layouter.can_lay_out(perm, self._map):
+            for perm in layouter.permutations:
+                monitor.num_permutations += 1
+                if monitor.get_status() is not None:
+                    break
+
+                # Record the earliest placed block that this permutation
+                # collides with. Backtracking any later than that block can
+                # never resolve the collision.
+                culprits = layouter.get_culprits(perm, self._map)
+                if culprits:
                     #print('    FAILED:', nx.get_node_attributes(perm, POSITION))
+                    layouter.conflicts.add(min(culprits, key=indices.get))
                     continue
+                layouter.checkpoint = self._map.layout.checkpoint()
                 layouter.add_to_layout(perm, self._map.layout)
                 #print('    SUCCESS:', list(perm.edges), nx.get_node_attributes(perm, POSITION))
                 layouter.done = True
@@ -127,33 +255,75 @@ class Layouter(object):
                 break
             else:
 
-                # Move the cursor back to the parent.
-                parent = g.parent(blocks[i])
-                #print('BACKTRACK:', blocks[i], 'TO:', parent)
-                while blocks[i] != parent:
-                    #print('    REWIND:', blocks[i], i)
-                    i -= 1
-
-                # Mark all blocks under the parent as not done and remove
-                # their permutations.
-                j = i
-                while j < len(blocks):
-                    olayouter = g.get_layouter(blocks[j])
-                    if olayouter.done:
-                        olayouter.done = False
-                        if blocks[j] != blocks[i]:
-                            olayouter.permutations.clear()
-                            #print('    REMOVE PERMS:', blocks[j])
-                    j += 1
-
-                # Remove the failed blocks from the layout.
-                rem_blocks = nx.dfs_tree(g, blocks[i])
-                for block in rem_blocks:
-                    olayouter = g.get_layouter(block)
-                    olayouter.remove_from_layout(self._map.layout)
+                # The root block has run out of permutations so there's nowhere
+                # left to jump back to. Start the search over.
+                if not layouter.conflicts:
+                    layouter.permutations = None
+                    monitor.num_backtracks += 1
+                    continue
+
+                # Remember that the block has no feasible permutation in this
+                # context.
+                if self._nogoods is not None and layouter.exhaustive:
+                    self._nogoods.add(
+                        blocks[i],
+                        self._map.layout,
+                        layouter.conflicts
+                    )
+
+                # Jump the cursor back to the most recently placed block in the
+                # conflict set. Every block in between is irrelevant to the
+                # failure. Pass the remaining conflicts on to the target so that
+                # if it fails too it can jump back further.
+                target = max(map(indices.get, layouter.conflicts))
+                monitor.num_backtracks += 1
+                #print('BACKJUMP:', blocks[i], 'TO:', blocks[target])
+                tlayouter = g.get_layouter(blocks[target])
+                tlayouter.conflicts.update(layouter.conflicts - {blocks[target]})
+
+                # Keep a copy of the layout before unwinding it if it's the
+                # best seen so far.
+                if i > best_placed:
+                    best_layout = self._map.layout.copy()
+                    best_placed = i
+
+                self.unwind(g, target, i)
+                i = target
+        else:
+            return len(blocks), LayoutStatus.COMPLETE
+
+        # Out of budget. Fall back to the best snapshot if the search has
+        # since jumped back past it.
+        if best_placed > i:
+            self._map.layout = best_layout
+            return best_placed, status
+        return i, status
 
     def run(self):
-        bg = self.get_block_graph()
-        self.bfs(bg)
-        print('complete:', len(self.g) == len(self._map.layout))
-        print('remainging:', set(self.g) - set(self._map.layout))
+        monitor = SearchMonitor(self._budget)
+        bg = self._block_graph
+        if bg is None:
+            bg = self.get_block_graph()
+
+        # Solve angles for all faces up front so that each face can try angles
+        # that are consistent with the rest of the graph first.
+        if self._angle_prepass:
+            faces = filter(lambda b: isinstance(b, FaceBlock), bg)
+            bg.angle_hints = AngleHints.from_budget(
+                self.g,
+                faces,
+                self._rng,
+                monitor
+            )
+        num_placed, status = self.bfs(bg, monitor)
+        result = LayoutResult(
+            status,
+            len(bg),
+            num_placed,
+            monitor.num_permutations,
+            monitor.num_backtracks,
+            monitor.elapsed
+        )
+        logger.debug('complete: %s', len(self.g) == len(self._map.layout))
+        logger.debug('remaining: %s', set(self.g) - set(self._map.layout))
+        return result
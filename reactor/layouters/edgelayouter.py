@@ -1,11 +1,12 @@
+import functools
 import itertools
 
 import networkx as nx
-from simple_settings import settings
-
 from reactor import utils
 from reactor.layouters.layouterbase import LayouterBase
+from reactor.layouters.permutationstream import PermutationStream
 from reactor.const import POSITION, DIRECTION, WEIGHT
+from reactor.edgeprofiles import DEFAULT_WEIGHT
 
 
 class EdgeLayouter(LayouterBase):
@@ -14,23 +15,23 @@ class EdgeLayouter(LayouterBase):
 
         # Collect valid step direction and lengths.
         dirs = self.get_start_direction_permutations(layout)
-        edge_weight = self.data.edge_data.get(WEIGHT, 1)
-        edge_settings = settings.EDGE_WEIGHTS[edge_weight]
-        lengths = range(
-            edge_settings['MIN_LENGTH'],
-            edge_settings['MAX_LENGTH'] + 1,
-            edge_settings['STEP_LENGTH']
-        )
+        edge_weight = self.data.edge_data.get(WEIGHT, DEFAULT_WEIGHT)
+        lengths = self.profiles.get_profile(edge_weight).lengths
+
+        # Create permutations from direction and length values. Each
+        # permutation is only built once it's consumed from the stream.
+        keys = list(itertools.product(dirs, lengths))
+        self.rng.shuffle(keys)
+        p_pos = layout.nodes[self.data.edge[0]][POSITION]
+        factory = functools.partial(self.get_permutation, p_pos=p_pos)
+        return PermutationStream(keys, factory)
 
-        # Create permutations from direction and length values.
+    def get_permutation(self, key, p_pos):
+        dir_, length = key
         head, tail = self.data.edge
-        p_pos = layout.nodes[head][POSITION]
-        perms = []
-        for dir_, length in itertools.product(dirs, lengths):
-            perm = nx.DiGraph()
-            edge_data = dict(self.data.edge_data, **{DIRECTION: dir_})
-            perm.add_edge(head, tail, **edge_data)
-            perm.nodes[head][POSITION] = p_pos
-            perm.nodes[tail][POSITION] = p_pos + utils.step(dir_, length)
-            perms.append(perm)
-        return perms
+        perm = nx.DiGraph()
+        edge_data = dict(self.data.edge_data, **{DIRECTION: dir_})
+        perm.add_edge(head, tail, **edge_data)
+        perm.nodes[head][POSITION] = p_pos
+        perm.nodes[tail][POSITION] = p_pos + utils.step(dir_, length)
+        return perm
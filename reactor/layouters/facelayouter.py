@@ -1,9 +1,13 @@
 import enum
+import functools
 import itertools as it
+import random
 
 import networkx as nx
 
+from reactor import utils
 from reactor.layouters.layouterbase import LayouterBase
+from reactor.layouters.permutationstream import PermutationStream
 from reactor.const import POSITION, DIRECTION, Direction, LENGTH, ANGLE, Angle
 from reactor.orthogonalface import OrthogonalFace, SideState
 
@@ -15,8 +19,76 @@ class NodeState(enum.IntEnum):
     KNOWN = 2
 
 
+def iter_angle_permutations(options, total=360, rng=random):
+    """
+    Yield every assignment of one angle per node from the given dict of
+    options whose angles sum to the total, in a uniformly random order.
+    Duplicate options are ignored.
+
+    Assignments are counted up front, per node and running sum, so that any
+    assignment can be built directly from its index. Indices are then drawn at
+    random without replacement. This means any prefix of the stream is a
+    uniform sample of all assignments, rather than variations on the first
+    few nodes' angles as a randomised depth-first search would give.
+
+    """
+    nodes = list(options)
+    values = [sorted(set(options[node])) for node in nodes]
+    if not all(values):
+        return
+
+    # Running sums that can be reached before each node.
+    reachable = [{0}]
+    for node_values in values:
+        reachable.append({s + v for s in reachable[-1] for v in node_values})
+
+    # Number of ways to complete an assignment from each node and running sum.
+    counts = [{} for _ in range(len(nodes))] + [{total: 1}]
+    for i in reversed(range(len(nodes))):
+        for subtotal in reachable[i]:
+            count = sum(counts[i + 1].get(subtotal + v, 0) for v in values[i])
+            if count:
+                counts[i][subtotal] = count
+
+    for index in utils.iter_random_indices(counts[0].get(0, 0), rng):
+        subtotal = 0
+        assignment = {}
+        for i, node in enumerate(nodes):
+            for value in values[i]:
+                count = counts[i + 1].get(subtotal + value, 0)
+                if index < count:
+                    break
+                index -= count
+            assignment[node] = value
+            subtotal += value
+        yield assignment
+
+
+def prepend_hints(hints, options, perms):
+    """
+    Yield the given hinted angle assignments that fit the options, followed by
+    the rest of the given permutations. Duplicates are skipped.
+
+    """
+    seen = set()
+    for hint in hints:
+        if not all(hint.get(node) in options[node] for node in options):
+            continue
+        key = tuple(hint[node] for node in options)
+        if key not in seen:
+            seen.add(key)
+            yield {node: hint[node] for node in options}
+    for perm in perms:
+        if tuple(perm[node] for node in options) not in seen:
+            yield perm
+
+
 class FaceLayouter(LayouterBase):
 
+    # Side lengths are drawn at random, so running out of permutations doesn't
+    # prove that a face can't be laid out.
+    exhaustive = False
+
     def get_angle_permutations(self, layout):
 
         # Warning! These edges aren't guaranteed to be contiguous.
@@ -27,7 +99,10 @@ class FaceLayouter(LayouterBase):
             state_idx = len([e for e in common_edges if node in e])
             state = NodeState(state_idx)
             if state == NodeState.KNOWN:
-                angle_perms[node] = (layout.get_explementary_angle(node),)
+
+                # No permutations fit if the node can't be closed.
+                angle = layout.get_explementary_angle(node)
+                angle_perms[node] = (angle,) if angle is not None else ()
             elif state == NodeState.UNKNOWN:
                 angle_perms[node] = layout.get_possible_angles(node)
             elif state == NodeState.FREE:
@@ -35,15 +110,69 @@ class FaceLayouter(LayouterBase):
 
         #print('angle_perms:', angle_perms)
 
-        # TODO: Check it this is ok...
-        # TODO: Not removing duplicates!
-        keys = angle_perms.keys()
-        vals = angle_perms.values()
-        for instance in it.product(*vals):
-            if sum(instance) == 360:
-                yield dict(zip(keys, instance))
-
-    def get_face_permutations(self, start_dir, layout):
+        perms = iter_angle_permutations(angle_perms, rng=self.rng)
+
+        # Try globally consistent solutions first if there are any.
+        if self.g.angle_hints is not None:
+            hints = self.g.angle_hints.get_face_angles(self.data)
+            perms = prepend_hints(hints, angle_perms, perms)
+        return perms
+
+    def get_face_permutation_keys(self, start_dir, layout):
+        angle_perms = self.get_angle_permutations(layout)
+        return ((start_dir, angles) for angles in angle_perms)
+
+    def get_face_permutation(self, key, offset, lengths):
+        start_dir, angles = key
+        oface = OrthogonalFace(
+            self.data,
+            angles,
+            lengths,
+            start_dir,
+            offset,
+            rng=self.rng,
+            profiles=self.profiles
+        )
+        for dir_, opp_dir in (Direction.xs(), Direction.ys()):
+
+            # Define two sides - one with the shorter proposed length and
+            # one with the longer proposed length.
+            min_side, max_side = oface.sides[opp_dir], oface.sides[dir_]
+            if max_side.proposed_length < min_side.proposed_length:
+                min_side, max_side = max_side, min_side
+
+            # If one of the sides has a known length then we must use that
+            # length.
+            max_length = max_side.proposed_length
+            if min_side.state == SideState.KNOWN:
+                max_length = min_side.length
+            elif max_side.state == SideState.KNOWN:
+                max_length = max_side.length
+
+            # If a side is unknown, split the remainder and divide it amongst
+            # the unknown edges.
+            for side in (min_side, max_side):
+                if side.state == SideState.KNOWN:
+                    continue
+                side_edge = (max_length - side.known_length) / float(side.num_unknown_edges)
+                for i in side.indices:
+                    if oface.lengths[i] is None:
+                        oface.set_length(i, side_edge)
+
+        return oface.to_graph()
+
+    def get_permutation_stream(self, keys, layout):
+        """
+        Return a stream that builds faces from the given keys. Keys are
+        expected to already be in a random order. Faces are only built as
+        they're consumed.
+
+        """
+        keys = iter(keys)
+        first = next(keys, None)
+        if first is None:
+            return PermutationStream((), None)
+        keys = it.chain((first,), keys)
 
         # There *must* be a common node already in the layout.
         offset = layout.nodes[self.data.source_edge[0]][POSITION]
@@ -54,76 +183,26 @@ class FaceLayouter(LayouterBase):
             for edge in self.data.edges
         }
 
-        ofaces = []
-        for angles in self.get_angle_permutations(layout):
-
-            oface = OrthogonalFace(self.data, angles, lengths, start_dir, offset)
-            ofaces.append(oface)
-
-            for dir_, opp_dir in (Direction.xs(), Direction.ys()):
-
-                # Define two sides - one with the shorter proposed length and
-                # one with the longer proposed length.
-                min_side, max_side = oface.sides[opp_dir], oface.sides[dir_]
-                if max_side.proposed_length < min_side.proposed_length:
-                    min_side, max_side = max_side, min_side
-
-                # If one of the sides has a known length then we must use that
-                # length.
-                max_length = max_side.proposed_length
-                if min_side.state == SideState.KNOWN:
-                    max_length = min_side.length
-                elif max_side.state == SideState.KNOWN:
-                    max_length = max_side.length
-
-                # If the min side is unknown, split the remainder and divide it
-                # amongst the edges.
-                if min_side.state == SideState.UNKNOWN:
-                    min_side_edge = (max_length - min_side.known_length) / float(min_side.num_unknown_edges)
-                    for edge in min_side.g.edges:
-                        oface.edges[edge][LENGTH] = min_side.g.edges[edge][LENGTH] or min_side_edge
-
-                # If the max side is unknown, split the remainder and divide it
-                # amongst the edges.
-                if max_side.state == SideState.UNKNOWN:
-                    max_side_edge = (max_length - max_side.known_length) / float(max_side.num_unknown_edges)
-                    for edge in max_side.g.edges:
-                        oface.edges[edge][LENGTH] = max_side.g.edges[edge][LENGTH] or max_side_edge
-
-            # Final node positions.
-            for node, pos in oface.node_positions.items():
-                oface.nodes[node][POSITION] = pos
-
-        return ofaces
+        factory = functools.partial(
+            self.get_face_permutation,
+            offset=offset,
+            lengths=lengths
+        )
+        return PermutationStream(keys, factory)
 
     def get_permutations(self, layout):
         rev_edge = tuple(reversed(self.data.source_edge))
         dir_ = Direction.opposite(layout.edges[rev_edge][DIRECTION])
-        return self.get_face_permutations(dir_, layout)
+        keys = self.get_face_permutation_keys(dir_, layout)
+        return self.get_permutation_stream(keys, layout)
 
     def add_to_layout(self, perm, layout):
 
-        # Per node angle data is a dict that must be updated or else clobbered.
-        for node in perm:
-            attr = layout.nodes.get(node, {}).pop(ANGLE, {})
-            attr.update({perm: perm.nodes[node].pop(ANGLE)})
-            perm.nodes[node][ANGLE] = attr
+        # Angles are indexed by the face block rather than kept as node data,
+        # as each node has a different angle in each of its faces.
+        # The angle merged into the node data is dropped again. Rolling back
+        # restores node data wholesale, so this needn't be recorded.
         super(FaceLayouter, self).add_to_layout(perm, layout)
-
-    def remove_from_layout(self, layout):
-        super(FaceLayouter, self).remove_from_layout(layout)
-
-        # Remove face data.
-        for node in self.data:
-            perms = layout.nodes.get(node, {}).get(ANGLE, {})
-            for perm in list(perms.keys()):
-                if set(perm.nodes) == set(self.data.nodes):
-                    print(node, 'popped:', perm)
-                    perms.pop(perm)
-            #for layout_node in
-            #print(layout.nodes.get(node, {}))
-            #popped = layout.nodes.get(node, {}).pop(ANGLE, {}).pop(perm, None)
-            #if popped is not None:
-            #    print('&&&&&&&&&', popped)
-            #    raise
-        #for p
+        for node in perm:
+            layout.add_angle(node, self.data, perm.nodes[node][ANGLE])
+            layout.nodes[node].pop(ANGLE)
@@ -1,20 +1,34 @@
 import abc
 import itertools
+import random
+
+import numpy as np
 
 from reactor import utils
 from reactor.geometry.rect import Rect
-from reactor.const import DIRECTION, Direction
+from reactor.geometry.rectset import RectSet
+from reactor.const import BLOCK, DIRECTION, POSITION, Direction
+from reactor.edgeprofiles import get_default_profiles
 
 
 class LayouterBase(object):
 
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self, data, g):
+    # Whether the permutations of a block are fully determined by the layout
+    # around it. Only failures of blocks with exhaustive permutations can be
+    # remembered as nogoods.
+    exhaustive = True
+
+    def __init__(self, data, g, rng=random):
         self.data = data
         self.g = g
+        self.rng = rng
+        self.profiles = getattr(g, 'profiles', None) or get_default_profiles()
         self.done = False
+        self.checkpoint = None
         self.permutations = None
+        self.conflicts = set()
 
     @abc.abstractmethod
     def get_permutations(self, layout):
@@ -33,32 +47,112 @@ class LayouterBase(object):
             dirs.discard(layout.edges[out_edge].get(DIRECTION))
         return dirs
 
+    def get_colliding_edges(self, perm, map_):
+        """
+        Yield all edges in the layout that collide with the given permutation.
+
+        """
+        # Only edges whose rects fall in the same cells of the layout's spatial
+        # index can possibly collide. Discard any edge that shares at least one
+        # node - this stops edges from intersecting with themselves (in the
+        # case of adjacent faces) and edges from intersecting with their
+        # parents (in the edge of contiguous edges).
+        perm_nodes = set(itertools.chain.from_iterable(perm.edges))
+        for e1 in perm.edges:
+            r1 = utils.get_edge_rect(perm, e1, self.profiles)
+            for e2 in map_.layout.edge_index.query(r1):
+                if e2[0] in perm_nodes or e2[1] in perm_nodes:
+                    continue
+                if r1.intersects(map_.layout.edge_rects[e2]):
+                    yield e2
+
+    def get_culprits(self, perm, map_):
+        """
+        Return the set of placed blocks that own an edge colliding with the
+        given permutation.
+
+        """
+        return {
+            map_.layout.edges[edge][BLOCK]
+            for edge in self.get_colliding_edges(perm, map_)
+        }
+
     def can_lay_out(self, perm, map_):
+        return next(self.get_colliding_edges(perm, map_), None) is None
 
-        # Create the list of edges to test collision against. Discard any edge
-        # that shares at least one node - this stops edges from intersecting
-        # with themselves (in the case of adjacent faces) and edges from
-        # intersecting with their parents (in the edge of contiguous edges).
-        test_edges = set(map_.layout.edges)
-        for e1, e2 in itertools.product(perm.edges, map_.layout.edges):
-            if set(e1) & set(e2):
-                test_edges.discard(e2)
+    def get_collision_matrix(self, perms, map_):
+        """
+        Return the list of edges in the layout along with a boolean array of
+        shape (num perms, num layout edges) flagging which layout edges each of
+        the given permutations collides with. This is the batched equivalent of
+        calling get_colliding_edges on each permutation - the rects of all
+        permutation edges are packed into a single array and tested against
+        all rects in the layout at once.
 
-        for e1, e2 in itertools.product(perm.edges, test_edges):
-            r1 = utils.get_edge_rect(perm, e1)
-            r2 = utils.get_edge_rect(map_.layout, e2)
-            if r1.intersects(r2):
-                return False
+        """
+        core = map_.layout.core
+        edge_ids = core.get_edge_ids()
+        layout_edges = [core.edges[edge_id] for edge_id in edge_ids]
+        collisions = np.zeros((len(perms), len(layout_edges)), dtype=bool)
+        if not perms or not layout_edges:
+            return layout_edges, collisions
 
-        return True
+        # Layout edge rects and interned edge nodes come straight from the
+        # layout's arrays so shared nodes can be tested with array lookups.
+        node_ids = core.node_ids
+        layout_nodes = core.edge_nodes[edge_ids]
+        layout_rects = core.rects[edge_ids]
+
+        # Pack the edge rects of all permutations into one set, noting which
+        # permutation each row belongs to. Also flag the layout nodes each
+        # permutation touches.
+        perm_ids, perm_rects = [], RectSet()
+        perm_nodes = np.zeros((len(perms), len(core.nodes)), dtype=bool)
+        for perm_id, perm in enumerate(perms):
+            for edge in perm.edges:
+                perm_ids.append(perm_id)
+                perm_rects.append(utils.get_edge_rect(perm, edge, self.profiles))
+                for node in edge:
+                    if node in node_ids:
+                        perm_nodes[perm_id, node_ids[node]] = True
+        if not perm_ids:
+            return layout_edges, collisions
+        perm_ids = np.array(perm_ids)
+
+        # Test every permutation edge against every layout edge. Discard any
+        # pair where the layout edge shares a node with the permutation, as
+        # per get_colliding_edges.
+        intersects = perm_rects.intersects(layout_rects)
+        shared = (
+            perm_nodes[:, layout_nodes[:, 0]] |
+            perm_nodes[:, layout_nodes[:, 1]]
+        )
+        np.logical_or.at(collisions, perm_ids, intersects & ~shared[perm_ids])
+        return layout_edges, collisions
+
+    def get_feasibility_mask(self, perms, map_):
+        """
+        Return a boolean array flagging which of the given permutations can be
+        laid out.
+
+        """
+        collisions = self.get_collision_matrix(perms, map_)[1]
+        return ~collisions.any(axis=1)
 
     def add_to_layout(self, perm, layout):
-        layout.update(perm)
-
-    def remove_from_layout(self, layout):
-        layout.remove_edges_from(self.data.edges)
-        rem_nodes = []
-        for node in self.data:
-            if not layout.in_edges(node) and not layout.out_edges(node):
-                rem_nodes.append(node)
-        layout.remove_nodes_from(rem_nodes)
+        layout.merge(perm)
+        for node in perm:
+            layout.set_node_position(node, layout.nodes[node][POSITION])
+
+        # Index all edges touching the permutation. Edges already in the layout
+        # are included as the positions of their shared nodes may have been
+        # updated.
+        edges = set(layout.in_edges(perm.nodes))
+        edges.update(layout.out_edges(perm.nodes))
+        for edge in edges:
+            layout.set_edge_rect(edge, utils.get_edge_rect(layout, edge, self.profiles))
+
+        # Record which block owns each edge so collisions can be traced back
+        # to the block that caused them.
+        for edge in perm.edges:
+            layout.update_edge(*edge, {BLOCK: self.data})
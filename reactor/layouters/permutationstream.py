@@ -0,0 +1,66 @@
+from collections import deque
+
+
+MAX_BATCH_SIZE = 64
+
+_EXHAUSTED = object()
+
+
+class PermutationStream(object):
+
+    """
+    Lazily builds permutations from an iterable of cheap keys, eg direction
+    and angle combinations. A permutation is only built by the factory function
+    when it's consumed, so the cost of a stream scales with the number of
+    permutations actually tried rather than the size of the permutation space.
+    Any randomisation must be applied to the keys before they're passed in.
+
+    """
+
+    def __init__(self, keys, factory):
+        self._keys = iter(keys)
+        self._factory = factory
+        self._next_key = next(self._keys, _EXHAUSTED)
+        self._buffer = deque()
+        self._batch_size = 1
+        self.mask_func = None
+
+    def __bool__(self):
+        return bool(self._buffer) or self._next_key is not _EXHAUSTED
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._buffer:
+            if self._next_key is _EXHAUSTED:
+                raise StopIteration
+            self._buffer.extend(self._build_batch())
+        return self._buffer.popleft()
+
+    def _take_keys(self, num):
+        keys = []
+        while len(keys) < num and self._next_key is not _EXHAUSTED:
+            keys.append(self._next_key)
+            self._next_key = next(self._keys, _EXHAUSTED)
+        return keys
+
+    def _build_batch(self):
+        """
+        Build the next batch of permutations. Without a mask function this is
+        a single permutation. With one, permutations are built in batches that
+        double in size each time so they can be filtered together, while
+        keeping the number built but never tried to a minimum.
+
+        """
+        perms = [self._factory(key) for key in self._take_keys(self._batch_size)]
+        if self.mask_func is None:
+            return perms
+        self._batch_size = min(self._batch_size * 2, MAX_BATCH_SIZE)
+        mask = self.mask_func(perms)
+        return [perm for perm, keep in zip(perms, mask) if keep]
+
+    def clear(self):
+        self._keys = iter(())
+        self._next_key = _EXHAUSTED
+        self._buffer.clear()
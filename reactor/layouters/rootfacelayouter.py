@@ -1,10 +1,15 @@
+from reactor import utils
 from reactor.layouters.facelayouter import FaceLayouter
 
 
 class RootFaceLayouter(FaceLayouter):
 
     def get_permutations(self, layout):
-        faces = []
-        for dir_ in self.get_start_direction_permutations(layout):
-            faces.extend(self.get_face_permutations(dir_, layout))
-        return faces
+        keys = [
+            self.get_face_permutation_keys(dir_, layout)
+            for dir_ in self.get_start_direction_permutations(layout)
+        ]
+        return self.get_permutation_stream(
+            utils.random_interleave(keys, self.rng),
+            layout
+        )
@@ -1,14 +1,18 @@
 import networkx as nx
 
 from reactor.layouters.layouterbase import LayouterBase
+from reactor.layouters.permutationstream import PermutationStream
 from reactor.const import POSITION
-from reactor.geometry.vector import Vector2
+from reactor.geometry.point import Point2
 
 
 class RootLayouter(LayouterBase):
 
     def get_permutations(self, layout):
+        return PermutationStream([None], self.get_permutation)
+
+    def get_permutation(self, key):
         node = next(iter(self.data))
         g = nx.DiGraph()
-        g.add_node(node, **{POSITION: Vector2(0, 0)})
-        return [g]
+        g.add_node(node, **{POSITION: Point2(0, 0)})
+        return g
@@ -6,3 +6,4 @@ class Map(object):
     def __init__(self):
         self.layout = OrthogonalLayout()
         self.rooms = []
+        self.layout_result = None
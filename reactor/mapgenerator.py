@@ -1,18 +1,73 @@
+import logging
+import multiprocessing
+import os
+import random
 from operator import itemgetter
 
 from reactor.layouter import Layouter
 from reactor.map import Map
-from reactor.readers.gexfreader import GEXFReader
+from reactor.mapplan import PLAN_EXTN, MapPlan
+from reactor.readers.streaminggexfreader import StreamingGEXFReader
 from reactor.roomplacer import RoomPlacer
 
 
+logger = logging.getLogger(__name__)
+
+
+# Per worker state for portfolio runs, set by the pool initialiser so that the
+# plan is only compiled once, by the parent.
+_worker = {}
+
+
+def _init_worker(grid_path, plan_data, kwargs):
+    _worker['grid_path'] = grid_path
+    _worker['plan'] = MapPlan.from_data(plan_data)
+    _worker['kwargs'] = kwargs
+
+
+def _run_seed(seed):
+    """
+    Run a map generator for the given seed in a worker process. A seed that
+    runs out of budget is an expected failure and gives an empty result. Any
+    error is logged and also gives an empty result, so that one bad seed
+    doesn't stop the rest of the portfolio.
+
+    """
+    gen = MapGenerator(
+        _worker['grid_path'],
+        rng=random.Random(seed),
+        **_worker['kwargs']
+    )
+    try:
+        map_ = gen.run(_worker['plan'])
+    except Exception:
+        logger.exception('Seed %s of %s failed', seed, _worker['grid_path'])
+        return seed, None
+    if not map_.layout_result.complete:
+        return seed, None
+    return seed, map_
+
+
 class MapGenerator(object):
 
-    def __init__(self, grid_path):
+    def __init__(
+        self,
+        grid_path,
+        nogoods=None,
+        budget=None,
+        rng=random,
+        angle_prepass=False,
+        profiles=None
+    ):
         self._grid_path = grid_path
+        self._nogoods = nogoods
+        self._budget = budget
+        self._rng = rng
+        self._angle_prepass = angle_prepass
+        self._profiles = profiles
 
     def load_graph(self):
-        g = GEXFReader()(self._grid_path).to_undirected()
+        g = StreamingGEXFReader()(self._grid_path).to_undirected()
 
         # Ensure no node has a degree greater than 4.
         max_degree = list(filter(lambda x: x[1] > 4, g.degree))
@@ -21,11 +76,56 @@ class MapGenerator(object):
 
         return g
 
-    def run(self):
-        g = self.load_graph()
+    def load_plan(self):
+        """
+        Load the map plan for the grid path. This is read straight from the
+        file if the path is a compiled plan, otherwise it's compiled from the
+        graph.
+
+        """
+        if os.path.splitext(self._grid_path)[-1] == PLAN_EXTN:
+            return MapPlan.load(self._grid_path)
+        return MapPlan.compile(self.load_graph())
+
+    def run(self, plan=None):
+        if plan is None:
+            plan = self.load_plan()
         map_ = Map()
-        layouter = Layouter(g, map_)
-        layouter.run()
-        room_placer = RoomPlacer(g, map_)
+        layouter = Layouter(
+            plan.g,
+            map_,
+            nogoods=self._nogoods,
+            budget=self._budget,
+            rng=self._rng,
+            angle_prepass=self._angle_prepass,
+            profiles=self._profiles,
+            block_graph=plan.get_block_graph(self._rng, self._profiles)
+        )
+        map_.layout_result = layouter.run()
+        room_placer = RoomPlacer(plan.g, map_, self._rng, self._profiles)
         room_placer.run()
         return map_
+
+    def run_portfolio(self, seeds, processes=None):
+        """
+        Race the generator over the given seeds in a process pool and return
+        the first complete map, or None if no seed produced one. Errors loading
+        the graph are raised before any seed is run. All other runs are
+        cancelled as soon as a complete map is found. The generator's settings,
+        including its budget, apply to each seed separately. Each worker
+        starts with its own copy of the nogood store.
+
+        """
+        plan = self.load_plan()
+        kwargs = {
+            'nogoods': self._nogoods,
+            'budget': self._budget,
+            'angle_prepass': self._angle_prepass,
+            'profiles': self._profiles,
+        }
+        init_args = (self._grid_path, plan.to_data(), kwargs)
+        with multiprocessing.Pool(processes, _init_worker, init_args) as pool:
+            for seed, map_ in pool.imap_unordered(_run_seed, seeds):
+                if map_ is not None:
+                    return map_
+        return None
@@ -0,0 +1,139 @@
+import json
+import random
+import zlib
+
+import networkx as nx
+
+from reactor.blocks.blockgraph import BlockGraph
+from reactor.blocks.edgeblock import EdgeBlock
+from reactor.blocks.faceblock import FaceBlock
+from reactor.blocks.rootblock import RootBlock
+from reactor.const import POSITION
+from reactor.geometry.vector import Vector2
+from reactor.layouter import Layouter
+
+
+PLAN_VERSION = 2
+PLAN_EXTN = '.plan'
+
+ROOT = 0
+EDGE = 1
+FACE = 2
+
+
+class MapPlan(object):
+
+    """
+    The deterministic part of map generation for an input graph, ie the graph
+    itself plus its blocks in layout order and their parents. A plan can be
+    saved to a compressed JSON file and loaded again, so repeated runs over
+    the same input only pay for the randomised layout and room placement.
+
+    Blocks are shared by every block graph built from the plan. They aren't
+    changed by laying out, which only touches the block graph.
+
+    """
+
+    def __init__(self, g, blocks, parent_positions):
+        self.g = g
+        self.blocks = blocks
+        self.parent_positions = parent_positions
+
+    @classmethod
+    def compile(cls, g):
+        bg = Layouter(g, None).get_block_graph()
+        return cls(g, list(bg.blocks), list(bg.parent_positions))
+
+    def get_block_graph(self, rng=random, profiles=None):
+        bg = BlockGraph(rng=rng, profiles=profiles)
+        bg.add_node(self.blocks[0])
+        for block, parent_position in zip(self.blocks[1:], self.parent_positions[1:]):
+            bg.add_edge(self.blocks[parent_position], block)
+        bg.build_index()
+        return bg
+
+    def to_data(self):
+        """
+        Return the plan as plain data, with nodes interned to their index in
+        the graph. The data only uses JSON types, though tuples come back from
+        JSON as lists.
+
+        """
+        nodes = list(self.g)
+        node_ids = {node: i for i, node in enumerate(nodes)}
+        node_data = []
+        for node in nodes:
+            data = dict(self.g.nodes[node])
+            if POSITION in data:
+                data[POSITION] = tuple(map(float, data[POSITION]))
+            node_data.append(data)
+        edges = [(node_ids[u], node_ids[v]) for u, v in self.g.edges]
+        edge_data = [dict(self.g.edges[edge]) for edge in self.g.edges]
+
+        # Blocks are stored as their nodes in order plus the one edge that
+        # orients them, ie a face's source edge or an edge block's edge.
+        blocks = []
+        for block in self.blocks:
+            if isinstance(block, FaceBlock):
+                kind, edge = FACE, block.source_edge
+            elif isinstance(block, EdgeBlock):
+                kind, edge = EDGE, block.edge
+            else:
+                kind, edge = ROOT, None
+            if edge is not None:
+                edge = node_ids[edge[0]], node_ids[edge[1]]
+            blocks.append((kind, tuple(node_ids[node] for node in block), edge))
+
+        return {
+            'version': PLAN_VERSION,
+            'nodes': nodes,
+            'node_data': node_data,
+            'edges': edges,
+            'edge_data': edge_data,
+            'blocks': blocks,
+            'parent_positions': list(self.parent_positions),
+        }
+
+    @classmethod
+    def from_data(cls, data):
+        if data.get('version') != PLAN_VERSION:
+            msg = 'Plan version {} is not supported'
+            raise ValueError(msg.format(data.get('version')))
+
+        nodes = data['nodes']
+        g = nx.Graph()
+        for node, node_data in zip(nodes, data['node_data']):
+            node_data = dict(node_data)
+            if POSITION in node_data:
+                node_data[POSITION] = Vector2(*node_data[POSITION])
+            g.add_node(node, **node_data)
+        for (u, v), edge_data in zip(data['edges'], data['edge_data']):
+            g.add_edge(nodes[u], nodes[v], **edge_data)
+
+        blocks = []
+        for kind, node_ids, edge in data['blocks']:
+            block_nodes = [nodes[i] for i in node_ids]
+            if kind == FACE:
+                block = FaceBlock.from_path(block_nodes, g.subgraph(block_nodes))
+                block.source_edge = nodes[edge[0]], nodes[edge[1]]
+            elif kind == EDGE:
+                block = EdgeBlock()
+                block.add_nodes_from((node, g.nodes[node]) for node in block_nodes)
+                u, v = nodes[edge[0]], nodes[edge[1]]
+                block.add_edge(u, v, **g.edges[u, v])
+            else:
+                block = RootBlock(g.subgraph(block_nodes))
+            blocks.append(block)
+
+        return cls(g, blocks, data['parent_positions'])
+
+    def save(self, path):
+        data = json.dumps(self.to_data(), separators=(',', ':'))
+        with open(path, 'wb') as f:
+            f.write(zlib.compress(data.encode('utf-8')))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        return cls.from_data(data)
@@ -0,0 +1,193 @@
+import json
+import os
+from collections import defaultdict
+
+from reactor.const import DIRECTION, POSITION
+
+
+PRECISION = 6
+
+# Bumped whenever saved nogoods may be unsound, so that older files aren't
+# loaded.
+NOGOOD_VERSION = 2
+
+
+class NogoodStore(object):
+
+    """
+    Records block contexts that are known to have no feasible permutation.
+
+    A nogood is keyed by block and stores two sets of edge geometry relative to
+    the block's anchor node. The constraint set is every laid out edge that
+    touches the block - these fix the block's permutations so must match the
+    current layout exactly. The culprit set is every edge owned by the blocks
+    in the conflict set - if these are all present the block will fail again.
+
+    Positions are relative to the anchor so nogoods learned from one seed can
+    be reused by any other seed of the same input graph.
+
+    Only failures of blocks whose permutations are exhaustive should be
+    added. A face draws its side lengths at random, so running out of
+    permutations once doesn't mean it will fail again.
+
+    """
+
+    def __init__(self):
+        self._nogoods = defaultdict(list)
+
+    def __len__(self):
+        return sum(map(len, self._nogoods.values()))
+
+    @staticmethod
+    def get_block_key(block):
+        return tuple(sorted(block))
+
+    @staticmethod
+    def get_anchor(block, layout):
+        return min(filter(lambda n: n in layout, block), default=None)
+
+    @staticmethod
+    def get_edge_item(edge, layout, anchor):
+        ax, ay = layout.nodes[anchor][POSITION]
+        rect = layout.edge_rects[edge]
+        return (
+            tuple(edge),
+            layout.edges[edge].get(DIRECTION),
+            round(rect.p1.x - ax, PRECISION),
+            round(rect.p1.y - ay, PRECISION),
+            round(rect.p2.x - ax, PRECISION),
+            round(rect.p2.y - ay, PRECISION),
+        )
+
+    def get_constraint_items(self, block, layout, anchor):
+        edges = set(layout.in_edges(block.nodes))
+        edges.update(layout.out_edges(block.nodes))
+        return frozenset(
+            self.get_edge_item(edge, layout, anchor) for edge in edges
+        )
+
+    def add(self, block, layout, conflicts):
+        """
+        Record that the given block cannot be laid out while the edges of the
+        given conflicting blocks remain where they are in the layout.
+
+        """
+        anchor = self.get_anchor(block, layout)
+        if anchor is None or not conflicts:
+            return
+        culprits = frozenset(
+            self.get_edge_item(edge, layout, anchor)
+            for conflict in conflicts
+            for edge in conflict.edges
+            if edge in layout.edge_rects
+        )
+        constraints = self.get_constraint_items(block, layout, anchor)
+
+        # A nogood without constraints or culprits would match every context,
+        # eg when the only conflict is the root which places no edges.
+        if not constraints or not culprits:
+            return
+        nogood = (constraints, culprits)
+        nogoods = self._nogoods[self.get_block_key(block)]
+        if nogood not in nogoods:
+            nogoods.append(nogood)
+
+    def find(self, block, layout):
+        """
+        Return the layout edges that caused the given block to fail in the
+        current context, or None if there's no matching nogood. A match always
+        has at least one edge, so it never sends the search back to the root.
+
+        """
+        nogoods = self._nogoods.get(self.get_block_key(block))
+        anchor = self.get_anchor(block, layout)
+        if not nogoods or anchor is None:
+            return None
+        constraints = self.get_constraint_items(block, layout, anchor)
+        for nogood_constraints, culprits in nogoods:
+            if not culprits or nogood_constraints != constraints:
+                continue
+            edges = []
+            for item in culprits:
+                edge = item[0]
+                if (
+                    edge not in layout.edge_rects or
+                    self.get_edge_item(edge, layout, anchor) != item
+                ):
+                    break
+                edges.append(edge)
+            else:
+                return edges
+        return None
+
+    def mark(self):
+        """
+        Return a marker for the nogoods stored so far, so that to_data can
+        return only those added since.
+
+        """
+        return {key: len(nogoods) for key, nogoods in self._nogoods.items()}
+
+    def to_data(self, mark=None):
+        """
+        Return the nogoods as plain data, or just those added since the given
+        mark.
+
+        """
+        mark = mark or {}
+        return [
+            {
+                'block': list(key),
+                'constraints': [list(item) for item in constraints],
+                'culprits': [list(item) for item in culprits],
+            }
+            for key, nogoods in self._nogoods.items()
+            for constraints, culprits in nogoods[mark.get(key, 0):]
+        ]
+
+    def update(self, data):
+        """
+        Add the nogoods from the given plain data, skipping any already stored.
+
+        """
+        def to_item(item):
+            return (tuple(item[0]),) + tuple(item[1:])
+
+        for record in data:
+            nogood = (
+                frozenset(map(to_item, record['constraints'])),
+                frozenset(map(to_item, record['culprits'])),
+            )
+
+            # Skip empty nogoods saved by older versions.
+            if not all(nogood):
+                continue
+            nogoods = self._nogoods[tuple(record['block'])]
+            if nogood not in nogoods:
+                nogoods.append(nogood)
+
+    @classmethod
+    def from_data(cls, data):
+        store = cls()
+        store.update(data)
+        return store
+
+    def save(self, path):
+        dir_path = os.path.split(path)[0]
+        if dir_path and not os.path.isdir(dir_path):
+            os.makedirs(dir_path)
+        with open(path, 'w') as f:
+            json.dump({'version': NOGOOD_VERSION, 'nogoods': self.to_data()}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+
+        # Files saved before versioning are a plain list, and may hold nogoods
+        # of faces, which aren't sound.
+        version = data.get('version') if isinstance(data, dict) else None
+        if version != NOGOOD_VERSION:
+            msg = 'Nogood version {} is not supported'
+            raise ValueError(msg.format(version))
+        return cls.from_data(data['nogoods'])
@@ -1,14 +1,19 @@
 import enum
 import random
-from collections import defaultdict
 
 import networkx as nx
-from simple_settings import settings
 
-from reactor import utils
-from reactor.const import Direction, Angle, ANGLE, LENGTH, DIRECTION, WEIGHT
-from reactor.blocks.faceblock import FaceBlock
-from reactor.geometry.vector import Vector2
+from reactor.const import (
+    ANGLE,
+    DIRECTION,
+    DIRECTION_STEPS,
+    LENGTH,
+    POSITION,
+    TURNS,
+    WEIGHT,
+)
+from reactor.edgeprofiles import get_default_profiles
+from reactor.geometry.point import Point2
 
 
 class SideState(enum.IntEnum):
@@ -19,24 +24,32 @@ class SideState(enum.IntEnum):
 
 class Side(object):
 
-    def __init__(self, g):
-        self.g = g
-
-        # Cache some random edge lengths.
-        # TODO: We do this in a few places. Still need to find a home for this.
-        self.rand_edges = []
-        for edge in self.g.edges:
-            edge_weight = self.g.edges[edge].get(WEIGHT, 1)
-            edge_settings = settings.EDGE_WEIGHTS[edge_weight]
-            self.rand_edges.append(random.randrange(
-                edge_settings['MIN_LENGTH'],
-                edge_settings['MAX_LENGTH'] + 1,
-                edge_settings['STEP_LENGTH'])
-            )
+    """
+    The edges of a face that share a direction. Holds indices into the face's
+    edge arrays and keeps running sums of the side's lengths.
+
+    """
+
+    def __init__(self, face, indices, rng=random):
+        self.face = face
+        self.indices = indices
+        self.known_length = 0
+        self.num_unknown_edges = 0
+
+        # Random lengths are only needed for the unknown edges, which are
+        # given a proposed length drawn from their weight's profile.
+        self.rand_length = 0
+        for i in indices:
+            length = face.lengths[i]
+            if length is not None:
+                self.known_length += length
+                continue
+            self.num_unknown_edges += 1
+            self.rand_length += rng.choice(face.profiles.get_profile(face.weights[i]).lengths)
 
     @property
     def lengths(self):
-        return [self.g.edges[e].get(LENGTH) for e in self.g.edges]
+        return [self.face.lengths[i] for i in self.indices]
 
     @property
     def state(self):
@@ -44,66 +57,111 @@ class Side(object):
 
     @property
     def length(self):
-        return sum(self.lengths)
-
-    @property
-    def known_length(self):
-        return sum([l or 0 for l in self.lengths])
+        return self.known_length
 
     @property
     def proposed_length(self):
-        return sum([l or self.rand_edges[i] for i, l in enumerate(self.lengths)])
-
-    @property
-    def num_unknown_edges(self):
-        return self.lengths.count(None)
-
-
-class OrthogonalFace(FaceBlock):
-
-    def __init__(self, face, angles, lengths, direction, offset=None):
-        super(OrthogonalFace, self).__init__(face)
-
-        # Important! Set the source edge the same as the given face.
-        if face.source_edge is not None:
-            self.source_edge = face.source_edge
-
+        return self.known_length + self.rand_length
+
+    def update_length(self, old_length, length):
+        if old_length is None:
+            self.num_unknown_edges -= 1
+        else:
+            self.known_length -= old_length
+        if length is None:
+            self.num_unknown_edges += 1
+        else:
+            self.known_length += length
+
+
+class OrthogonalFace(object):
+
+    """
+    A face with an angle at every node and a direction and length for every
+    edge. Data is held in flat lists in the cyclic order of the face, starting
+    at the face's source edge. Faces are built in large numbers as layout
+    permutations, so the graph is only built once a face is finalised.
+
+    """
+
+    def __init__(
+        self,
+        face,
+        angles,
+        lengths,
+        direction,
+        offset=None,
+        rng=random,
+        profiles=None
+    ):
+        self.face = face
+        self.rng = rng
+        self.profiles = profiles if profiles is not None else get_default_profiles()
         self.start_direction = direction
-        self.offset = offset if offset is not None else Vector2(0, 0)
+        self.offset = offset if offset is not None else Point2(0, 0)
+
+        # Cyclic node and edge order.
+        self.edges = list(face.edges_forward)
+        self.nodes = [edge[0] for edge in self.edges]
+        self.weights = [face.edges[edge].get(WEIGHT, 1) for edge in self.edges]
 
         # Set node and edge data.
-        nx.set_node_attributes(self, angles, ANGLE)
-        nx.set_edge_attributes(self, lengths, LENGTH)
-        nx.set_edge_attributes(self, dict(self._edge_walk()), DIRECTION)
+        self.angles = [angles[node] for node in self.nodes]
+        self.lengths = [lengths.get(edge) for edge in self.edges]
+        self.directions = list(self._walk_directions())
 
         # Calculate sides.
         self.sides = self._calculate_sides()
 
-    def _edge_walk(self):
+    def _walk_directions(self):
         direction = self.start_direction
-        for edge in self.edges_forward:
-            yield edge, direction
-            angle = self.nodes[edge[1]][ANGLE]
-            if angle == Angle.INSIDE:
-                direction += 1
-            elif angle == Angle.OUTSIDE:
-                direction -= 1
-            direction = Direction.normalise(direction)
+        for i in range(len(self.edges)):
+            yield direction
+            angle = self.angles[(i + 1) % len(self.nodes)]
+            direction = TURNS[direction, angle]
 
     def _calculate_sides(self):
-        edges = defaultdict(list)
-        for edge in self.edges:
-            edges[self.edges[edge][DIRECTION]].append(edge)
+        indices = {}
+        for i, dir_ in enumerate(self.directions):
+            indices.setdefault(dir_, []).append(i)
         return {
-            dir_: Side(nx.DiGraph(self).edge_subgraph(edges))
-            for dir_, edges in edges.items()
+            dir_: Side(self, dir_indices, self.rng)
+            for dir_, dir_indices in indices.items()
         }
 
+    def set_length(self, index, length):
+        self.sides[self.directions[index]].update_length(self.lengths[index], length)
+        self.lengths[index] = length
+
     @property
     def node_positions(self):
         positions = {}
-        pos = Vector2(0, 0)
-        for edge, direction in self._edge_walk():
-            positions[edge[0]] = pos + self.offset
-            pos += utils.step(direction, self.edges[edge][LENGTH])
+        x, y = self.offset
+        for i, node in enumerate(self.nodes):
+            positions[node] = Point2(x, y)
+            dx, dy = DIRECTION_STEPS[self.directions[i]]
+            x += dx * self.lengths[i]
+            y += dy * self.lengths[i]
         return positions
+
+    def to_graph(self):
+        """
+        Build the face as a graph that can be laid out, carrying over the node
+        and edge data of the original face.
+
+        """
+        g = nx.DiGraph()
+        positions = self.node_positions
+        for i, node in enumerate(self.nodes):
+            node_data = dict(
+                self.face.nodes[node],
+                **{ANGLE: self.angles[i], POSITION: positions[node]}
+            )
+            g.add_node(node, **node_data)
+        for i, edge in enumerate(self.edges):
+            edge_data = dict(
+                self.face.edges[edge],
+                **{LENGTH: self.lengths[i], DIRECTION: self.directions[i]}
+            )
+            g.add_edge(*edge, **edge_data)
+        return g
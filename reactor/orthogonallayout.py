@@ -1,30 +1,156 @@
 import networkx as nx
 
-from reactor.const import ANGLE, Angle
+from reactor.angleindex import AngleIndex
+from reactor.const import DIRECTION, LENGTH, WEIGHT, Angle
+from reactor.layoutcore import EdgeRectView, LayoutCore
 
 
 class OrthogonalLayout(nx.DiGraph):
 
-    def get_existing_angles(self, node):
-        return nx.get_node_attributes(self, ANGLE).get(node)
+    def __init__(self, *args, **kwargs):
+        super(OrthogonalLayout, self).__init__(*args, **kwargs)
+
+        # Array-backed layout geometry for vectorised queries. This holds the
+        # rects of all edges in the layout, plus a broad-phase index of them.
+        # Placed edges never move so rects are calculated once when an edge is
+        # laid out.
+        self.core = LayoutCore()
+
+        # Angles of each laid out face at each of its nodes.
+        self.angles = AngleIndex()
+
+        # Undo log of every change made through the methods below, so that
+        # layouts can be rolled back to a checkpoint when the search
+        # backtracks.
+        self._trail = []
+
+    def checkpoint(self):
+        """
+        Return a marker for the current state of the layout that can later be
+        rolled back to.
+
+        """
+        return len(self._trail)
+
+    def rollback(self, checkpoint):
+        """
+        Undo every change made since the given checkpoint, most recent first.
+
+        """
+        while len(self._trail) > checkpoint:
+            func, args = self._trail.pop()
+            func(*args)
+
+    @property
+    def edge_rects(self):
+        return EdgeRectView(self.core)
+
+    @property
+    def edge_index(self):
+        return self.core.index
+
+    def _record(self, func, *args):
+        self._trail.append((func, args))
+
+    def update_node(self, node, data):
+        if node in self._node:
+            self._record(self._set_node_data, node, dict(self._node[node]))
+            self._node[node].update(data)
+        else:
+            self._record(self.remove_node, node)
+            self.add_node(node, **data)
+
+    def _set_node_data(self, node, data):
+        self._node[node].clear()
+        self._node[node].update(data)
+
+    def update_edge(self, u, v, data):
+        if self.has_edge(u, v):
+            self._record(self._set_edge_data, u, v, dict(self._adj[u][v]))
+            self._adj[u][v].update(data)
+        else:
+            self._record(self.remove_edge, u, v)
+            self.add_edge(u, v, **data)
+
+    def _set_edge_data(self, u, v, data):
+        self._adj[u][v].clear()
+        self._adj[u][v].update(data)
+
+    def merge(self, g):
+        """
+        Add the nodes and edges of the given graph, updating the data of any
+        that already exist.
+
+        """
+        for node, data in g.nodes(data=True):
+            self.update_node(node, data)
+        for u, v, data in g.edges(data=True):
+            self.update_edge(u, v, data)
+
+    def set_node_position(self, node, pos):
+        if node in self.core.node_ids:
+            old_pos = tuple(self.core.get_node_position(node))
+            self._record(self.core.set_node_position, node, old_pos)
+        else:
+            self._record(self.core.remove_node, node)
+        self.core.set_node_position(node, pos)
+
+    def set_edge_rect(self, edge, rect):
+        if edge in self.core.edge_ids:
+            self._record(self._set_edge_rect, edge, self.core.get_edge_rect(edge))
+        else:
+            self._record(self.core.remove_edge, edge)
+        self._set_edge_rect(edge, rect)
+
+    def _set_edge_rect(self, edge, rect):
+        data = self.edges[edge]
+        self.core.set_edge(
+            edge,
+            rect,
+            data.get(DIRECTION),
+            data.get(LENGTH),
+            data.get(WEIGHT, 1)
+        )
+
+    def add_angle(self, node, face, angle):
+        old_angle = self.angles.get(node, face)
+        if old_angle is not None:
+            self._record(self.angles.add, node, face, old_angle)
+        else:
+            self._record(self.angles.remove, node, face)
+        self.angles.add(node, face, angle)
+
+    def copy(self, as_view=False):
+        """
+        Copy the layout along with its edge rects and face angles. The copy
+        starts with an empty undo log.
+
+        """
+        g = super(OrthogonalLayout, self).copy(as_view=as_view)
+        if as_view:
+            return g
+        g.core = self.core.copy()
+        g.angles = self.angles.copy()
+        return g
 
     def get_common_edges(self, face):
         return filter(lambda x: x in self.edges, face.edges_reverse)
 
     def get_possible_angles(self, node):
-        existing_angles = self.get_existing_angles(node)
-        if existing_angles is None:
+        if node not in self.angles:
             return list(Angle)
-        total = sum(existing_angles.values())
+        total = self.angles.get_total(node)
         return tuple(filter(lambda a: a <= total, Angle))
 
     # Rename to "get_outer_angle"?
     def get_explementary_angle(self, node):
-        existing_angles = self.get_existing_angles(node)
-        total = sum(map(lambda a: 180 - a, existing_angles.values()))
+        """
+        Return the angle that closes the given node, or None if the angles
+        already around it leave no orthogonal angle to close it with.
+
+        """
+        total = self.angles.get_explementary_total(node)
         try:
             return Angle(180 - (360 - total))
         except ValueError:
-            print(existing_angles)
-            print('Node:', node, 'has bad angle')
-            raise
+            return None
@@ -0,0 +1,123 @@
+import math
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from reactor.const import POSITION
+from reactor.geometry.rectset import RectSet
+
+
+DEFAULT_SCALE = 8
+DEFAULT_PADDING = 1
+DEFAULT_NODE_SIZE = 3
+
+BACKGROUND_COLOUR = (255, 255, 255)
+ROOM_COLOUR = (160, 160, 160)
+EDGE_COLOUR = (60, 140, 60)
+NODE_COLOUR = (31, 119, 180)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_chunk(chunk_type, data):
+    chunk = chunk_type + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk))
+
+
+def encode_png(image):
+    """
+    Encode an (H, W, 3) uint8 RGB array as PNG bytes.
+
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+
+    # Every scanline is prefixed with a filter type byte, 0 being no filter.
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, width * 3)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join((
+        PNG_SIGNATURE,
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(rows.tobytes())),
+        _png_chunk(b'IEND', b''),
+    ))
+
+
+def write_png(path, image):
+    dir_path = os.path.split(path)[0]
+    if dir_path and not os.path.isdir(dir_path):
+        os.makedirs(dir_path)
+    with open(path, 'wb') as f:
+        f.write(encode_png(image))
+
+
+class MapRasteriser(object):
+
+    """
+    Paint a map's rooms, edge rects and nodes into an RGB array, at the given
+    number of pixels per layout unit. Rects are painted as array slices, so
+    this needs neither matplotlib nor a display.
+
+    """
+
+    def __init__(
+        self,
+        scale=DEFAULT_SCALE,
+        padding=DEFAULT_PADDING,
+        node_size=DEFAULT_NODE_SIZE
+    ):
+        self.scale = scale
+        self.padding = padding
+        self.node_size = node_size
+
+    @staticmethod
+    def _normalise(rects):
+        array = RectSet.to_array(rects).reshape(-1, 4)
+        return np.hstack((
+            np.minimum(array[:, :2], array[:, 2:]),
+            np.maximum(array[:, :2], array[:, 2:]),
+        ))
+
+    def _paint(self, image, rects, colour):
+        for c1, r1, c2, r2 in rects:
+            image[r1:r2, c1:c2] = colour
+
+    def render(self, map_):
+        layout = map_.layout
+        rooms = self._normalise(map_.rooms)
+        edges = self._normalise(list(layout.edge_rects.values()))
+        nodes = np.array(
+            [tuple(pos) for pos in dict(layout.nodes(data=POSITION)).values() if pos is not None],
+            dtype=np.float64
+        ).reshape(-1, 2)
+
+        # Find the extents of everything to be drawn, in layout units.
+        points = np.vstack((rooms[:, :2], rooms[:, 2:], edges[:, :2], edges[:, 2:], nodes))
+        if not len(points):
+            return np.full((1, 1, 3), BACKGROUND_COLOUR, dtype=np.uint8)
+        origin = points.min(axis=0) - self.padding
+        size = points.max(axis=0) + self.padding - origin
+        width, height = (math.ceil(s * self.scale) for s in size)
+        image = np.full((height, width, 3), BACKGROUND_COLOUR, dtype=np.uint8)
+
+        # Convert rects to pixel bounds, flipping y so that up is up. Every
+        # rect covers at least one pixel.
+        def to_pixels(rects):
+            x1 = np.floor((rects[:, 0] - origin[0]) * self.scale)
+            x2 = np.maximum(np.ceil((rects[:, 2] - origin[0]) * self.scale), x1 + 1)
+            y1 = np.floor((rects[:, 1] - origin[1]) * self.scale)
+            y2 = np.maximum(np.ceil((rects[:, 3] - origin[1]) * self.scale), y1 + 1)
+            return np.column_stack((x1, height - y2, x2, height - y1)).astype(int)
+
+        half_size = self.node_size / 2.0 / self.scale
+        node_rects = np.hstack((nodes - half_size, nodes + half_size))
+        self._paint(image, to_pixels(rooms), ROOM_COLOUR)
+        self._paint(image, to_pixels(edges), EDGE_COLOUR)
+        self._paint(image, to_pixels(node_rects), NODE_COLOUR)
+        return image
+
+    def save(self, map_, path):
+        write_png(path, self.render(map_))
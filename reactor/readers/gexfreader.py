@@ -2,7 +2,8 @@ import networkx as nx
 
 from networkx.readwrite.gexf import GEXFReader as GEXFReader_
 
-from reactor.const import POSITION
+from reactor.const import POSITION, WEIGHT
+from reactor.edgeprofiles import parse_weight
 from reactor.geometry.vector import Vector2
 
 
@@ -23,6 +24,11 @@ class GEXFReader(GEXFReader_):
             pos = g.nodes[node]['viz']['position']
             g.nodes[node][POSITION] = Vector2(pos['x'], pos['y'])
 
+        # Weights are stored as doubles but are used to index edge profiles.
+        for edge in g.edges:
+            if WEIGHT in g.edges[edge]:
+                g.edges[edge][WEIGHT] = parse_weight(g.edges[edge][WEIGHT])
+
         # Ensure graph cannot be modified.
         nx.freeze(g)
 
@@ -0,0 +1,81 @@
+from xml.etree.ElementTree import iterparse
+
+import networkx as nx
+
+from reactor.const import POSITION, WEIGHT
+from reactor.edgeprofiles import parse_weight
+from reactor.geometry.vector import Vector2
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+class StreamingGEXFReader(object):
+
+    """
+    A GEXF reader that only reads what map generation needs, ie node ids and
+    positions, and edges and their weights. The file is read in one streaming
+    pass and the graph built in bulk at the end, which is much faster than
+    the networkx reader on large graphs.
+
+    Weights are read from an edge's weight attribute or from an attvalue for
+    an edge attribute titled weight, and are stored as ints like the full
+    reader. Weights that aren't whole numbers raise a ValueError.
+
+    """
+
+    def __call__(self, path):
+        directed = False
+        attr_class = None
+        weight_ids = set()
+        nodes = []
+        edges = []
+        pos = None
+        weight = None
+        in_edge = False
+
+        for event, elem in iterparse(path, events=('start', 'end')):
+            tag = _local_name(elem.tag)
+            if event == 'start':
+                if tag == 'graph':
+                    directed = elem.get('defaultedgetype') == 'directed'
+                elif tag == 'attributes':
+                    attr_class = elem.get('class')
+                elif tag == 'edge':
+                    in_edge = True
+                    weight = None
+                continue
+
+            if tag == 'attribute':
+                if attr_class == 'edge' and elem.get('title') == WEIGHT:
+                    weight_ids.add(elem.get('id'))
+            elif tag == 'position':
+                pos = Vector2(float(elem.get('x')), float(elem.get('y')))
+            elif tag == 'node':
+                data = {POSITION: pos} if pos is not None else {}
+                nodes.append((elem.get('id'), data))
+                pos = None
+                elem.clear()
+            elif tag == 'attvalue':
+
+                # Attribute ids are only unique within a class, so only take
+                # the weight from attvalues inside an edge.
+                if in_edge and elem.get('for') in weight_ids:
+                    weight = elem.get('value')
+            elif tag == 'edge':
+                if weight is None:
+                    weight = elem.get(WEIGHT)
+                data = {WEIGHT: parse_weight(weight)} if weight is not None else {}
+                edges.append((elem.get('source'), elem.get('target'), data))
+                in_edge = False
+                elem.clear()
+
+        g = nx.DiGraph() if directed else nx.Graph()
+        g.add_nodes_from(nodes)
+        g.add_edges_from(edges)
+
+        # Ensure graph cannot be modified.
+        nx.freeze(g)
+
+        return g
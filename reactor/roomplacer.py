@@ -2,40 +2,43 @@ import random
 from collections import deque
 
 import networkx as nx
-from simple_settings import settings
 
-from reactor import utils
 from reactor.const import Direction, POSITION, WEIGHT
-from reactor.geometry.rect import Rect
-from reactor.geometry.vector import Vector2
+from reactor.edgeprofiles import DEFAULT_WEIGHT, get_default_profiles
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect, Rect
+from reactor.geometry.rectset import RectSet
 
 
 class Room(Rect):
 
-    def __init__(self, pos, g, node):
-        super(Room, self).__init__(pos - Vector2(0.5, 0.5), pos + Vector2(0.5, 0.5))
+    def __init__(self, pos, g, node, rng=random, profiles=None):
+        x, y = pos
+        super(Room, self).__init__(
+            Point2(x - 0.5, y - 0.5),
+            Point2(x + 0.5, y + 0.5)
+        )
 
+        if profiles is None:
+            profiles = get_default_profiles()
         edge_weight = max([
-            g.edges[edge].get(WEIGHT, 1)
+            g.edges[edge].get(WEIGHT, DEFAULT_WEIGHT)
             for edge in g.edges(node)]
         )
-        edge_settings = settings.EDGE_WEIGHTS[edge_weight]
-        self.max_width = random.randrange(
-            edge_settings['ROOM_MIN_WIDTH'],
-            edge_settings['ROOM_MAX_WIDTH']
-        )
-        self.max_height = random.randrange(
-            edge_settings['ROOM_MIN_HEIGHT'],
-            edge_settings['ROOM_MAX_HEIGHT']
-        )
+        profile = profiles.get_profile(edge_weight)
+        self.max_width = rng.choice(profile.room_widths)
+        self.max_height = rng.choice(profile.room_heights)
 
 
 class RoomPlacer:
 
-    def __init__(self, g, map_):
+    def __init__(self, g, map_, rng=random, profiles=None):
         self._g = g
         self._map = map_
+        self._rng = rng
+        self._profiles = profiles if profiles is not None else get_default_profiles()
         self.rooms = {}
+        self.room_rects = RectSet()
 
     @property
     def g(self):
@@ -44,44 +47,48 @@ class RoomPlacer:
     def can_place(self, node, room):
 
         # Test that the given room doesn't intersect with any other room.
-        for onode in self._map.layout.nodes:
-            if node == onode:
-                continue
-            oroom = self.rooms.get(onode)
-            if oroom is None:
-                continue
-            if room.intersects(oroom):
+        for onode in self.room_rects.get_intersecting_keys(room):
+            if onode != node:
                 return False
 
         # Check that the room doesn't intersect any edges on the graph (aside
         # from the in / out edges of the node it belongs to.
-        edges = set(self._map.layout.edges)
-        edges -= set(self._map.layout.in_edges(node))
-        edges -= set(self._map.layout.out_edges(node))
+        layout = self._map.layout
+        edges = layout.edge_index.query(room)
+        edges -= set(layout.in_edges(node))
+        edges -= set(layout.out_edges(node))
         for edge in edges:
-            edge_rect = utils.get_edge_rect(self._map.layout, edge)
-            if room.intersects(edge_rect):
+            if room.intersects(layout.edge_rects[edge]):
                 return False
 
         return True
 
     def run(self):
 
-        # Build rooms on all nodes at unit dimensions.
+        # Build rooms on all nodes at unit dimensions. Only nodes that made it
+        # into the layout are considered as it may be partial.
         pos = nx.get_node_attributes(self._map.layout, POSITION)
-        for node in self.g.nodes:
+        nodes = [node for node in self.g.nodes if node in pos]
+        for node in nodes:
 
             # Edge weight for a node is the max of all incident edges.
-            edge_weight = max([self.g.edges[edge].get(WEIGHT, 1) for edge in self.g.edges(node)])
-            edge_settings = settings.EDGE_WEIGHTS[edge_weight]
-
-            # TODO: Clean this up and put into settings somewhere. This tells us
-            # to use different room chances per edge weight.
-            if random.random() <= edge_settings['ROOM_CHANCE']:
-                self.rooms[node] = Room(pos[node], self.g, node)
+            edge_weight = max([
+                self.g.edges[edge].get(WEIGHT, DEFAULT_WEIGHT)
+                for edge in self.g.edges(node)
+            ])
+            profile = self._profiles.get_profile(edge_weight)
+            if self._rng.random() <= profile.room_chance:
+                self.rooms[node] = Room(
+                    pos[node],
+                    self.g,
+                    node,
+                    self._rng,
+                    self._profiles
+                )
+                self.room_rects.append(self.rooms[node], node)
 
         # Now attempt to grow rooms.
-        nodes = deque(self.g.nodes)
+        nodes = deque(nodes)
         while nodes:
             node = nodes.popleft()
             room = self.rooms.get(node)
@@ -91,25 +98,24 @@ class RoomPlacer:
             # Iterate directions and grow the rect by one unit each time.
             changed = False
             directions = list(Direction)
-            random.shuffle(directions)
+            self._rng.shuffle(directions)
             for direction in directions:
-                test_room = Rect(room.p1.copy(), room.p2.copy())
+                (x1, y1), (x2, y2) = room.p1, room.p2
                 if direction == Direction.UP and room.height < room.max_height:
-                    test_room.p2[1] += 1
+                    y2 += 1
                 elif direction == Direction.RIGHT and room.width < room.max_width:
-                    test_room.p2[0] += 1
+                    x2 += 1
                 elif direction == Direction.DOWN and room.height < room.max_height:
-                    test_room.p1[1] -= 1
+                    y1 -= 1
                 elif direction == Direction.LEFT and room.width < room.max_width:
-                    test_room.p1[0] -= 1
+                    x1 -= 1
+                test_room = FrozenRect(Point2(x1, y1), Point2(x2, y2))
 
                 # If there were no collisions, make the test room the actual
                 # room.
                 if self.can_place(node, test_room):
-                    room.p1.x = test_room.p1.x
-                    room.p1.y = test_room.p1.y
-                    room.p2.x = test_room.p2.x
-                    room.p2.y = test_room.p2.y
+                    room.p1, room.p2 = test_room
+                    self.room_rects.append(room, node)
                     changed = True
 
             # If the room hasn't changed then it's grown to its maximum size.
@@ -3,13 +3,13 @@ import random
 
 import matplotlib.pyplot as plt
 import networkx as nx
-from simple_settings import settings
 
 from reactor import const
 from reactor.blocks.faceblock import FaceBlock
-from reactor.const import POSITION, WEIGHT, WIDTH
-from reactor.geometry.rect import Rect
-from reactor.geometry.vector import Vector2
+from reactor.const import POSITION, WEIGHT
+from reactor.edgeprofiles import get_default_profiles
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect
 from reactor.orthogonalface import OrthogonalFace
 from reactor.map import Map
 
@@ -17,13 +17,46 @@ from reactor.map import Map
 MAP_SIZE = (10, 10)
 
 
-def weighted_shuffle(items, weights):
+def weighted_shuffle(items, weights, rng=random):
     order = sorted(
-        range(len(items)), key=lambda i: random.random() ** (1.0 / weights[i])
+        range(len(items)), key=lambda i: rng.random() ** (1.0 / weights[i])
     )
     return [items[i] for i in order]
 
 
+def random_interleave(iterables, rng=random):
+    """
+    Lazily merge the given iterables, drawing each item from a randomly chosen
+    iterable that hasn't yet been exhausted.
+
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    while iterators:
+        i = rng.randrange(len(iterators))
+        try:
+            yield next(iterators[i])
+        except StopIteration:
+            iterators.pop(i)
+
+
+def iter_random_indices(n, rng=random):
+    """
+    Lazily yield the integers from 0 to n in a uniformly random order. Indices
+    are drawn by rejection while most are still unseen, and the remainder are
+    shuffled, so taking only the first few costs next to nothing.
+
+    """
+    seen = set()
+    while len(seen) < n // 2:
+        index = rng.randrange(n)
+        if index not in seen:
+            seen.add(index)
+            yield index
+    rest = [index for index in range(n) if index not in seen]
+    rng.shuffle(rest)
+    yield from rest
+
+
 def get_node_position(g, node):
     return g.nodes[node].get(const.POSITION)
 
@@ -35,39 +68,33 @@ def get_edge_positions(g, edge):
     )
 
 
-def get_edge_rect(g, edge):
-    rect = Rect(*get_edge_positions(g, edge))
-    rect.normalise()
-    edge_weight = g.edges[edge].get(WEIGHT, 1)
-    edge_settings = settings.EDGE_WEIGHTS[edge_weight]
-    edge_width = edge_settings.get(WIDTH, 1)
-    rect.inflate(edge_width / 2.0)
-    return rect
+def get_edge_rect(g, edge, profiles=None):
+    if profiles is None:
+        profiles = get_default_profiles()
+    rect = FrozenRect.from_points(*get_edge_positions(g, edge))
+    edge_width = profiles.get_edge_profile(g, edge).width
+    return rect.inflated(edge_width / 2.0)
 
 
 def get_edge_rects(g):
-    return [get_edge_rect(g, edge) for edge in g.edges]
 
+    # Layouts store the rects of their edges as they're laid out, so prefer
+    # those over recalculating them.
+    edge_rects = getattr(g, 'edge_rects', {})
+    return [edge_rects.get(edge) or get_edge_rect(g, edge) for edge in g.edges]
 
-def get_random_direction(directions=None):
+
+def get_random_direction(directions=None, rng=random):
     directions = directions or list(const.Direction)
-    idx = random.randint(0, len(directions) - 1)
+    idx = rng.randint(0, len(directions) - 1)
     return directions[idx]
 
 
 def step(direction, length=1):
-    pos = Vector2(0, 0)
-    if direction == const.Direction.UP:
-        pos[1] += length
-    elif direction == const.Direction.RIGHT:
-        pos[0] += length
-    elif direction == const.Direction.DOWN:
-        pos[1] -= length
-    elif direction == const.Direction.LEFT:
-        pos[0] -= length
-    else:
+    if direction not in const.DIRECTIONS:
         raise Exception('Unknown direction: {}'.format(direction))
-    return pos
+    dx, dy = const.DIRECTION_STEPS[direction]
+    return Point2(dx * length, dy * length)
 
 
 def init_pyplot(figsize):
@@ -110,9 +137,9 @@ def draw_rect(rect, **kwargs):
     lengths[(1, 2)] = lengths[(3, 4)] = rect.height
     lengths[(2, 3)] = lengths[(4, 1)] = rect.width
     direction = const.Direction.UP
-    g = OrthogonalFace(face, angles, lengths, direction, rect.p1)
-    kwargs['pos'] = g.node_positions
-    nx.draw_networkx(g, **kwargs)
+    oface = OrthogonalFace(face, angles, lengths, direction, rect.p1)
+    kwargs['pos'] = oface.node_positions
+    nx.draw_networkx(oface.to_graph(), **kwargs)
 
 
 def draw_map(map_, save_path=None):
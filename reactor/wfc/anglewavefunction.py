@@ -10,7 +10,7 @@ from reactor.wfc.wavefunctionbase import Contradiction, WaveFunctionBase
 
 class AngleWaveFunction(WaveFunctionBase):
 
-    def __init__(self, g, block_g):
+    def __init__(self, g, block_g, rng=None):
 
         # Wave shape is 2D - dim 1 is the number of angle variants and dim 2 is
         # how many angles we have.
@@ -19,7 +19,7 @@ class AngleWaveFunction(WaveFunctionBase):
 
         # Tiles are each angle. Stub out ones for each weight.
         tile_weights = {angle: 1 for angle in list(Angle)}
-        super().__init__(shape, tile_weights)
+        super().__init__(shape, tile_weights, rng)
 
         self.block_g = block_g  # TODO: only need this for debug.. remove?
         self.absolute_angles = list(map(Angle.absolute, self.tiles))
@@ -27,6 +27,7 @@ class AngleWaveFunction(WaveFunctionBase):
         # Set up masks.
         i = 0
         self.nodes = []
+        self.block_nodes = []
         self.indices = []
         self.index_to_node_array = {}
         self.index_to_block_array = {}
@@ -46,6 +47,7 @@ class AngleWaveFunction(WaveFunctionBase):
                 node_masked.mask[(slice(None), i)] = False
                 index = (i,)
                 self.nodes.append(node + f'\n[{block_index}]')
+                self.block_nodes.append((block, node))
                 self.indices.append(index)
                 self.index_to_node_array[index] = node_masked
                 self.index_to_block_array[index] = block_masked
@@ -248,6 +250,17 @@ class AngleWaveFunction(WaveFunctionBase):
         if not self.is_collapsed(self.wave):
             super().run()
 
+    def get_block_angles(self):
+        """
+        Return the collapsed wave as a dict of angles per node, keyed by block.
+
+        """
+        block_angles = {}
+        tile_indices = np.argmax(self.wave, axis=0)
+        for (block, node), tile_index in zip(self.block_nodes, tile_indices):
+            block_angles.setdefault(block, {})[node] = self.tiles[tile_index]
+        return block_angles
+
     def debug(self, mask, title=None):
         print('')
 
@@ -1,4 +1,5 @@
 import abc
+import random
 
 import numpy as np
 
@@ -12,15 +13,31 @@ class Contradiction(Exception):
     pass
 
 
+class SolveAborted(Exception):
+
+    """Solving was stopped by its step limit or stop function."""
+
+    pass
+
+
 class WaveFunctionBase(metaclass=abc.ABCMeta):
 
-    def __init__(self, shape, tile_weights):
+    def __init__(self, shape, tile_weights, rng=None):
+
+        # Optional np.random.Generator. If not given the global numpy and
+        # python generators are used.
+        self.rng = rng
         tiles, weights = zip(*tile_weights.items())
         self.tiles = tiles
         self.weights = np.array(weights, dtype=np.float64)
         wave_shape = (len(self.tiles),) + shape
         self.wave = np.ones(wave_shape, dtype=bool)
 
+        # Optional limits on solving. The step limit bounds the number of
+        # tiles collapsed, and the stop function is polled before each one.
+        self.max_steps = None
+        self.stop_func = None
+
     @staticmethod
     def is_collapsed(array):
         unresolved = np.count_nonzero(array, axis=0) > 1
@@ -38,7 +55,8 @@ class WaveFunctionBase(metaclass=abc.ABCMeta):
         return tuple(directions)
 
     def get_min_entropy_coords_offset(self):
-        return np.random.random(self.wave.shape[1:]) * 0.1  # TODO: make const?
+        rng = self.rng if self.rng is not None else np.random
+        return rng.random(self.wave.shape[1:]) * 0.1  # TODO: make const?
 
     def get_min_entropy_coords(self):
         num_states = np.count_nonzero(self.wave, axis=0)
@@ -65,6 +83,7 @@ class WaveFunctionBase(metaclass=abc.ABCMeta):
         return weighted_shuffle(
             list(tile_weights.keys()),
             list(tile_weights.values()),
+            rng=self.rng if self.rng is not None else random,
         )
 
     @abc.abstractmethod
@@ -74,27 +93,54 @@ class WaveFunctionBase(metaclass=abc.ABCMeta):
     def backtrack(self, coords, original):
         self.wave = original
 
-    def recurse(self):
+    def _push(self, stack):
+        coords = self.get_min_entropy_coords()
+        stack.append((coords, self.get_valid_tiles(coords), self.wave.copy()))
+
+    def _check_limits(self, num_steps):
+        if self.max_steps is not None and num_steps >= self.max_steps:
+            raise SolveAborted('Ran out of steps')
+        if self.stop_func is not None and self.stop_func():
+            raise SolveAborted('Stopped')
 
+    def solve(self):
+        """
+        Depth-first search over the tiles of the lowest entropy coords until
+        the wave collapses. The stack holds the coords, untried tiles and
+        wave before collapsing for each level, so deep searches don't recurse.
+
+        """
         # TODO: Might be able to further abstract this into some
         # "bruteforcesovler" class.
-        coords = self.get_min_entropy_coords()
-        valid_tiles = self.get_valid_tiles(coords)
-        while valid_tiles:
-            original = self.wave.copy()
+        stack = []
+        self._push(stack)
+        num_steps = 0
+        while stack:
+            coords, valid_tiles, original = stack[-1]
+
+            # All tiles have failed here, so the choice made at the level
+            # above was wrong too. Set the wave back to before that choice.
+            if not valid_tiles:
+                stack.pop()
+                if not stack:
+                    raise Contradiction('Ran out of valid tiles')
+                self.backtrack(stack[-1][0], stack[-1][2].copy())
+                continue
+
+            self._check_limits(num_steps)
+            num_steps += 1
             self.collapse_to_tile(coords, valid_tiles.pop())
             try:
                 self.propagate(coords)
-                if not self.is_collapsed(self.wave):
-                    self.recurse()
-                break
-            except Contradiction as e:
+            except Contradiction:
 
                 # Something went wrong - set the wave back so we can try a new
                 # permutation.
-                self.backtrack(coords, original)
-        else:
-            raise Contradiction('Ran out of valid tiles')
+                self.backtrack(coords, original.copy())
+                continue
+            if self.is_collapsed(self.wave):
+                return
+            self._push(stack)
 
     def run(self):
-        self.recurse()
+        self.solve()
@@ -4,10 +4,12 @@ import random
 random.seed(2)
 sys.path.append(os.getcwd())
 
+import numpy as np
 import pyglet
 
 from reactor import utils
-from reactor.geometry.rect import Rect
+from reactor.geometry.rect import FrozenRect
+from reactor.geometry.rectset import RectSet
 from reactor.geometry.vector import Vector2
 from reactor.mapgenerator import MapGenerator
 
@@ -24,61 +26,35 @@ WINDOW_HEIGHT = 500
 
 
 def get_rects(map_):
-    rects = []
-
-    min_x = 0
-    min_y = 0
-
-    for room in map_.rooms:
-        rects.append(room)
-        min_x = min(min_x, room.p1.x)
-        min_y = min(min_y, room.p1.y)
+    rects = RectSet(map_.rooms)
 
     # Test drawing thick edges.
     for edge in map_.layout.edges:
-        rect = Rect(*utils.get_edge_positions(map_.layout, edge))
-        rect.normalise()
-        rect.inflate(0.5)
-        rects.append(rect)
-
-        min_x = min(min_x, rect.p1.x)
-        min_y = min(min_y, rect.p1.y)
+        rect = FrozenRect.from_points(*utils.get_edge_positions(map_.layout, edge))
+        rects.append(rect.inflated(0.5))
 
+    min_x = min(0, rects.array[:, 0].min(initial=0))
+    min_y = min(0, rects.array[:, 1].min(initial=0))
     print('min_x:', min_x)
     print('min_y:', min_y)
 
-    # Offset all rects.
-    for rect in rects:
-        rect.p1.x -= min_x + 0
-        rect.p2.x -= min_x + 0
-        rect.p1.y -= min_y + 0
-        rect.p2.y -= min_y + 0
-
-        print('after:', rect)
-
-    for rect in rects:
-        rect.p1.x += 1
-        rect.p2.x += 1
-        rect.p1.y += 1
-        rect.p2.y += 1
+    # Offset all rects so they start at one.
+    rects.translate(1 - min_x, 1 - min_y)
 
     return rects
 
 
 def build_map(width, height, rects):
-    map_ = []
-    for x in range(width):
-        row = []
-        for y in range(height):
-            point = Vector2(x + 0.5, y + 0.5)
-            point_within = False
-            for r in rects:
-                point_within = point_within or r.contains_point(point)
-                if point_within:
-                    break
-            row.append(point_within)
-        map_.append(row)
-    return map_
+
+    # Test the centre of every cell against every rect at once.
+    xs, ys = np.meshgrid(
+        np.arange(width) + 0.5,
+        np.arange(height) + 0.5,
+        indexing='ij'
+    )
+    points = np.stack([xs.ravel(), ys.ravel()], axis=1)
+    within = rects.contains_points(points).any(axis=0)
+    return within.reshape(width, height).tolist()
 
 
 def fix_bitmask_index(x):
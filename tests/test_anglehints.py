@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from reactor.anglehints import AngleHints
+from reactor.blocks.blockbuilder import build_block_graph
+from reactor.blocks.faceblock import FaceBlock
+from reactor.budget import SearchMonitor
+from reactor.readers.gexfreader import GEXFReader
+
+
+class TestAngleHints(unittest.TestCase):
+
+    def create_hints(self, **kwargs):
+        g = GEXFReader()('../data/test2.gexf').to_undirected()
+        faces = [block for block in build_block_graph(g) if isinstance(block, FaceBlock)]
+        return faces, AngleHints(g, faces, random.Random(0), **kwargs)
+
+    def test_solve_after_backtrack(self):
+        monitor = SearchMonitor()
+        faces, hints = self.create_hints(monitor=monitor)
+        self.assertEqual(len(list(hints.get_face_angles(faces[0]))), 1)
+
+        # Alternatives are only solved once the search has backtracked, and
+        # then only one per backtrack.
+        self.assertIsNone(hints.get_solution(1))
+        monitor.num_backtracks += 1
+        self.assertIsNotNone(hints.get_solution(1))
+        self.assertIsNone(hints.get_solution(2))
+        self.assertEqual(len(list(hints.get_face_angles(faces[0]))), 2)
+
+    def test_max_time(self):
+        faces, hints = self.create_hints(max_time=0)
+        self.assertEqual(list(hints.get_face_angles(faces[0])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
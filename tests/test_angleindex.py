@@ -0,0 +1,48 @@
+import unittest
+
+from reactor.angleindex import AngleIndex
+
+
+class TestAngleIndex(unittest.TestCase):
+
+    def test_totals(self):
+        index = AngleIndex()
+        index.add('a', 'f1', 90)
+        index.add('a', 'f2', 180)
+        index.add('b', 'f1', 90)
+        self.assertIn('a', index)
+        self.assertEqual(index.get_num_faces('a'), 2)
+        self.assertEqual(index.get_total('a'), 270)
+        self.assertEqual(index.get_explementary_total('a'), 90)
+        self.assertEqual(index.get('a', 'f2'), 180)
+
+    def test_replace(self):
+        index = AngleIndex()
+        index.add('a', 'f1', 90)
+        index.add('a', 'f1', 270)
+        self.assertEqual(index.get_num_faces('a'), 1)
+        self.assertEqual(index.get_total('a'), 270)
+
+    def test_remove(self):
+        index = AngleIndex()
+        index.add('a', 'f1', 90)
+        index.add('a', 'f2', 180)
+        self.assertEqual(index.remove('a', 'f1'), 90)
+        self.assertIsNone(index.remove('a', 'f1'))
+        self.assertEqual(index.get_total('a'), 180)
+        index.remove('a', 'f2')
+        self.assertNotIn('a', index)
+        self.assertEqual(index.get_total('a'), 0)
+        self.assertEqual(len(index), 0)
+
+    def test_copy(self):
+        index = AngleIndex()
+        index.add('a', 'f1', 90)
+        copy = index.copy()
+        copy.add('a', 'f2', 90)
+        self.assertEqual(index.get_total('a'), 90)
+        self.assertEqual(copy.get_total('a'), 180)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,12 @@
-import itertools as it
 import random
 import unittest
 
-import networkx as nx
 import numpy as np
 from parameterized import parameterized
 
-from reactor.blocks.edgeblock import EdgeBlock
-from reactor.blocks.faceblock import FaceBlock
-from reactor.faceanalysis import FaceAnalysis
+from reactor.blocks.blockbuilder import build_block_graph
 from reactor.wfc.anglewavefunction import AngleWaveFunction
+from reactor.wfc.wavefunctionbase import SolveAborted
 from reactor.readers.gexfreader import GEXFReader
 
 
@@ -22,27 +19,7 @@ class TestAngleWaveFunction(unittest.TestCase):
         return GEXFReader()(path).to_undirected()
 
     def create_block_graph(self, g):
-
-        # TODO: Remove this duplicate code from layouter.py
-        # Split the input graph into biconnected components. Each biconn will
-        # become a node in the block graph.
-        bg = nx.Graph()
-
-        # Build nodes.
-        biconns = list(nx.biconnected_components(g))
-        for biconn in biconns:
-            sg = g.subgraph(biconn)
-            if len(biconn) < 3:
-                bg.add_node(EdgeBlock(sg))
-            else:
-                for face in FaceAnalysis(sg).get_faces():
-                    fsg = g.subgraph(face)
-                    bg.add_node(FaceBlock.from_path(face, fsg))
-
-        # Build edges.
-        edges = filter(lambda x: x[0].is_adjacent(x[1]), it.combinations(bg, 2))
-        bg.add_edges_from(edges)
-        return bg
+        return build_block_graph(g)
 
     @parameterized.expand([
         '../data/quadrilateral.gexf',
@@ -71,6 +48,24 @@ class TestAngleWaveFunction(unittest.TestCase):
             for array in wf.index_to_node_array.values():
                 wf.check_sum_node_angle(array)
 
+    def test_rng(self):
+        g = self.load_graph('../data/grid2.gexf')
+        bg = self.create_block_graph(g)
+        waves = []
+        for _ in range(2):
+            wf = AngleWaveFunction(g, bg, rng=np.random.default_rng(3))
+            wf.run()
+            waves.append(wf.wave)
+        np.testing.assert_array_equal(*waves)
+
+
+    def test_stop_func(self):
+        g = self.load_graph('../data/test2.gexf')
+        bg = self.create_block_graph(g)
+        wf = AngleWaveFunction(g, bg, rng=np.random.default_rng(3))
+        wf.stop_func = lambda: True
+        with self.assertRaises(SolveAborted):
+            wf.run()
 
 if __name__ == '__main__':
     unittest.main()
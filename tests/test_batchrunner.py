@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+
+import project_settings
+from reactor.batchrunner import (
+    COMPLETE,
+    LOAD_ERROR,
+    TIMEOUT,
+    BatchRunner,
+    get_nogood_path,
+)
+from reactor.budget import Budget
+from reactor.edgeprofiles import EdgeProfiles
+from reactor.nogoodstore import NogoodStore
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def create_runner(self, names, seeds, **kwargs):
+        return BatchRunner(
+            [os.path.join(DATA_PATH, name) for name in names],
+            seeds,
+            processes=1,
+            output_path=self.temp_dir.name,
+            draw=False,
+            profiles=EdgeProfiles.from_settings(project_settings.EDGE_WEIGHTS),
+            **kwargs
+        )
+
+    def read_manifest(self, runner):
+        with open(runner.manifest_path) as f:
+            return [json.loads(line) for line in f]
+
+    def get_records(self, records):
+        return {(record['grid'], record['seed']): record for record in records}
+
+    def get_statuses(self, records):
+        return {
+            (os.path.split(record['grid'])[-1], record['seed']): record['status']
+            for record in records
+        }
+
+    def test_job_timeout(self):
+
+        # Space hulk can't be laid out within the timeout, so its worker is
+        # killed and the pool restarted for the remaining job.
+        runner = self.create_runner(
+            ['test1.gexf', 'space_hulk1.gexf'],
+            [0],
+            budget=Budget(max_time=60),
+            job_timeout=1
+        )
+        records = runner.run()
+        self.assertEqual(self.get_statuses(records), {
+            ('space_hulk1.gexf', 0): TIMEOUT,
+            ('test1.gexf', 0): COMPLETE,
+        })
+        self.assertEqual(self.read_manifest(runner), records)
+
+    def test_load_error(self):
+        runner = self.create_runner(['test1.gexf', 'missing.gexf'], [0, 1])
+        records = runner.run()
+        self.assertEqual(self.get_statuses(records), {
+            ('missing.gexf', 0): LOAD_ERROR,
+            ('missing.gexf', 1): LOAD_ERROR,
+            ('test1.gexf', 0): COMPLETE,
+            ('test1.gexf', 1): COMPLETE,
+        })
+        for record in records:
+            if record['status'] == LOAD_ERROR:
+                self.assertTrue(record['error'].startswith('FileNotFoundError'))
+
+    def test_resume(self):
+        runner = self.create_runner(['test1.gexf', 'test2.gexf'], [0, 1])
+        records = runner.run()
+        self.assertEqual(set(self.get_statuses(records).values()), {COMPLETE})
+
+        # Jobs are ordered by the times in the previous manifest.
+        times = runner.load_job_times()
+        self.assertEqual(set(times), set(runner._grid_paths))
+        plans, _ = runner.compile_plans()
+        grid_paths = sorted(times, key=times.get, reverse=True)
+        expected = [(grid_path, seed) for grid_path in grid_paths for seed in (0, 1)]
+        self.assertEqual(runner.get_jobs(plans), expected)
+
+        # Resuming carries over every finished job without running it again.
+        # Changing the seeds of a resumed run only runs the new ones.
+        runner = self.create_runner(['test1.gexf', 'test2.gexf'], [0, 1], resume=True)
+        self.assertEqual(self.get_records(runner.run()), self.get_records(records))
+        runner = self.create_runner(['test1.gexf', 'test2.gexf'], [1, 2], resume=True)
+        resumed = self.get_records(runner.run())
+        for key, record in self.get_records(records).items():
+            if key[1] == 1:
+                self.assertEqual(resumed[key], record)
+        self.assertEqual(self.get_statuses(resumed.values()), {
+            ('test1.gexf', 1): COMPLETE,
+            ('test2.gexf', 1): COMPLETE,
+            ('test1.gexf', 2): COMPLETE,
+            ('test2.gexf', 2): COMPLETE,
+        })
+        self.assertEqual(self.get_records(self.read_manifest(runner)), resumed)
+
+    def test_old_nogoods(self):
+
+        # Nogoods saved before versioning may hold unsound face nogoods, so
+        # they're ignored and replaced.
+        runner = self.create_runner(['test1.gexf'], [0], nogoods=True)
+        nogood_path = get_nogood_path(self.temp_dir.name, os.path.join(DATA_PATH, 'test1.gexf'))
+        os.makedirs(os.path.dirname(nogood_path))
+        with open(nogood_path, 'w') as f:
+            json.dump([{'block': ['a', 'b'], 'constraints': [], 'culprits': []}], f)
+        with self.assertLogs('reactor.batchrunner', 'WARNING'):
+            records = runner.run()
+        self.assertEqual(self.get_statuses(records), {('test1.gexf', 0): COMPLETE})
+        NogoodStore.load(nogood_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import itertools as it
+import unittest
+
+from parameterized import parameterized
+
+from reactor.blocks.blockbuilder import get_adjacent_blocks, get_blocks
+from reactor.readers.gexfreader import GEXFReader
+
+
+class TestBlockBuilder(unittest.TestCase):
+
+    @parameterized.expand([
+        '../data/grid2.gexf',
+        '../data/reactor5.gexf',
+        '../data/space_hulk1.gexf',
+        '../data/test10.gexf',
+        '../data/tree_and_cycle2.gexf',
+    ])
+    def test_get_adjacent_blocks(self, graph_path):
+        g = GEXFReader()(graph_path).to_undirected()
+        blocks = get_blocks(g)
+        expected = [
+            pair for pair in it.combinations(blocks, 2)
+            if pair[0].is_adjacent(pair[1])
+        ]
+        self.assertEqual(list(get_adjacent_blocks(blocks)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
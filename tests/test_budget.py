@@ -0,0 +1,21 @@
+import unittest
+
+from reactor.budget import Budget, LayoutStatus
+
+
+class TestBudget(unittest.TestCase):
+
+    def test_unbounded(self):
+        budget = Budget()
+        self.assertIsNone(budget.get_status(1e6, 1e6, 1e6))
+
+    def test_status(self):
+        budget = Budget(max_time=1, max_permutations=10, max_backtracks=2)
+        self.assertIsNone(budget.get_status(0.5, 9, 1))
+        self.assertEqual(budget.get_status(1, 9, 1), LayoutStatus.TIME_EXHAUSTED)
+        self.assertEqual(budget.get_status(0.5, 10, 1), LayoutStatus.PERMUTATIONS_EXHAUSTED)
+        self.assertEqual(budget.get_status(0.5, 9, 2), LayoutStatus.BACKTRACKS_EXHAUSTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import networkx as nx
+
+from reactor.const import WEIGHT, WIDTH
+from reactor.edgeprofiles import EdgeProfiles, parse_weight
+
+
+EDGE_WEIGHTS = {
+    1: {
+        'MIN_LENGTH': 2,
+        'MAX_LENGTH': 6,
+        'STEP_LENGTH': 2,
+        'ROOM_MIN_WIDTH': 1,
+        'ROOM_MAX_WIDTH': 3,
+        'ROOM_MIN_HEIGHT': 2,
+        'ROOM_MAX_HEIGHT': 4,
+        'ROOM_CHANCE': 0.5,
+    },
+    3: {
+        WIDTH: 2,
+        'MIN_LENGTH': 4,
+        'MAX_LENGTH': 4,
+        'STEP_LENGTH': 1,
+        'ROOM_MIN_WIDTH': 3,
+        'ROOM_MAX_WIDTH': 5,
+        'ROOM_MIN_HEIGHT': 3,
+        'ROOM_MAX_HEIGHT': 5,
+        'ROOM_CHANCE': 1,
+    },
+}
+
+
+class TestEdgeProfiles(unittest.TestCase):
+
+    def test_from_settings(self):
+        profiles = EdgeProfiles.from_settings(EDGE_WEIGHTS)
+        self.assertEqual(len(profiles), 4)
+        self.assertIsNone(profiles[0])
+        self.assertIsNone(profiles[2])
+        self.assertEqual(profiles[1].width, 1)
+        self.assertEqual(profiles[1].lengths, (2, 4, 6))
+        self.assertEqual(profiles[1].room_widths, (1, 2))
+        self.assertEqual(profiles[1].room_heights, (2, 3))
+        self.assertEqual(profiles[1].room_chance, 0.5)
+        self.assertEqual(profiles[3].width, 2)
+        self.assertEqual(profiles[3].lengths, (4,))
+
+    def test_get_edge_profile(self):
+        profiles = EdgeProfiles.from_settings(EDGE_WEIGHTS)
+        g = nx.Graph()
+        g.add_edge(1, 2)
+        g.add_edge(2, 3, **{WEIGHT: 3})
+        self.assertIs(profiles.get_edge_profile(g, (1, 2)), profiles[1])
+        self.assertIs(profiles.get_edge_profile(g, (2, 3)), profiles[3])
+
+    def test_get_profile_unknown(self):
+        profiles = EdgeProfiles.from_settings(EDGE_WEIGHTS)
+        for weight in (-1, 0, 2, 4):
+            with self.assertRaises(ValueError):
+                profiles.get_profile(weight)
+
+    def test_parse_weight(self):
+        self.assertEqual(parse_weight('2'), 2)
+        self.assertEqual(parse_weight('2.0'), 2)
+        self.assertEqual(parse_weight(3.0), 3)
+        with self.assertRaises(ValueError):
+            parse_weight('0.5')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import networkx as nx
+from parameterized import parameterized
+
+from reactor import faceanalysis
+from reactor.faceanalysis import FaceAnalysis
+from reactor.readers.gexfreader import GEXFReader
+
+
+class TestFaceAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        faceanalysis.clear_cache()
+
+    def get_biconns(self, path):
+        g = GEXFReader()(path).to_undirected()
+        for biconn in nx.biconnected_components(g):
+            if len(biconn) > 2:
+                yield g.subgraph(biconn)
+
+    def assert_faces(self, g, faces):
+
+        # Euler's formula, less the exterior face.
+        self.assertEqual(len(faces), len(g.edges) - len(g) + 1)
+
+        # Every edge borders two faces, one of which may be the exterior.
+        counts = {}
+        for face in faces:
+            for i, node in enumerate(face):
+                edge = frozenset((node, face[(i + 1) % len(face)]))
+                counts[edge] = counts.get(edge, 0) + 1
+        self.assertTrue(all(counts.get(frozenset(e), 0) in (1, 2) for e in g.edges))
+
+    @parameterized.expand([
+        '../data/grid2.gexf',
+        '../data/reactor5.gexf',
+        '../data/test10.gexf',
+    ])
+    def test_get_faces(self, graph_path):
+        for sg in self.get_biconns(graph_path):
+            for use_positions in (True, False):
+                faces = FaceAnalysis(sg, use_positions=use_positions).get_faces()
+                self.assert_faces(sg, faces)
+
+    def test_cache(self):
+        sg = next(self.get_biconns('../data/grid2.gexf'))
+        fa1 = FaceAnalysis(sg)
+        faces = fa1.get_faces()
+        fa2 = FaceAnalysis(sg.copy())
+        self.assertEqual(fa2.get_faces(), faces)
+        self.assertIsNot(fa2.embedding, fa1.embedding)
+        self.assertEqual(
+            fa2.embedding.get_data(),
+            fa1.embedding.get_data()
+        )
+        fa3 = FaceAnalysis(sg, use_cache=False)
+        self.assertEqual(fa3.get_faces(), faces)
+        self.assertIsNot(fa3.embedding, fa1.embedding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools as it
+import random
+import unittest
+
+from parameterized import parameterized
+
+from reactor.const import Angle
+from reactor.layouters.facelayouter import iter_angle_permutations, prepend_hints
+
+
+class TestIterAnglePermutations(unittest.TestCase):
+
+    def brute_force(self, options):
+        nodes = list(options)
+        return {
+            instance
+            for instance in it.product(*(set(options[n]) for n in nodes))
+            if sum(instance) == 360
+        }
+
+    @parameterized.expand([(seed,) for seed in range(20)])
+    def test_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        options = {}
+        for i in range(rng.randint(3, 8)):
+            num = rng.randint(1, 3)
+            options[i] = tuple(rng.choice(list(Angle)) for _ in range(num))
+        perms = [
+            tuple(perm[n] for n in options)
+            for perm in iter_angle_permutations(options, rng=rng)
+        ]
+        self.assertEqual(len(perms), len(set(perms)))
+        self.assertEqual(set(perms), self.brute_force(options))
+
+    def test_first_is_uniform(self):
+        options = {i: tuple(Angle) for i in range(5)}
+        solutions = self.brute_force(options)
+        counts = dict.fromkeys(solutions, 0)
+        num_runs = 50 * len(solutions)
+        for seed in range(num_runs):
+            perm = next(iter_angle_permutations(options, rng=random.Random(seed)))
+            counts[tuple(perm[n] for n in options)] += 1
+        self.assertGreater(min(counts.values()), 25)
+        self.assertLess(max(counts.values()), 75)
+
+    def test_no_options(self):
+        options = {'a': tuple(Angle), 'b': ()}
+        self.assertEqual(list(iter_angle_permutations(options)), [])
+
+
+class TestPrependHints(unittest.TestCase):
+
+    def test_prepend_hints(self):
+        options = {'a': tuple(Angle), 'b': (Angle.INSIDE,)}
+        hints = [
+            {'a': Angle.OUTSIDE, 'b': Angle.OUTSIDE},
+            {'a': Angle.STRAIGHT, 'b': Angle.INSIDE},
+            {'a': Angle.STRAIGHT, 'b': Angle.INSIDE},
+        ]
+        perms = [
+            {'a': Angle.INSIDE, 'b': Angle.INSIDE},
+            {'a': Angle.STRAIGHT, 'b': Angle.INSIDE},
+        ]
+        self.assertEqual(list(prepend_hints(hints, options, perms)), [
+            {'a': Angle.STRAIGHT, 'b': Angle.INSIDE},
+            {'a': Angle.INSIDE, 'b': Angle.INSIDE},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
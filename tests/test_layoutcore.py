@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from reactor.geometry.rect import Rect
+from reactor.geometry.vector import Vector2
+from reactor.layoutcore import LayoutCore
+
+
+class TestLayoutCore(unittest.TestCase):
+
+    def test_grow(self):
+        core = LayoutCore(capacity=2)
+        for i in range(5):
+            core.set_node_position(i, Vector2(i, -i))
+            rect = Rect(Vector2(i, i), Vector2(i + 1, i + 1))
+            core.set_edge((i, i + 1), rect, direction=1, length=2)
+        self.assertEqual(core.num_nodes, 6)
+        self.assertEqual(core.num_edges, 5)
+        np.testing.assert_array_equal(core.get_node_position(4), [4, -4])
+        edge_ids = core.get_edge_ids()
+        self.assertEqual([core.edges[i] for i in edge_ids], [(i, i + 1) for i in range(5)])
+        np.testing.assert_array_equal(core.rects[edge_ids][:, 0], range(5))
+
+    def test_remove_reuses_ids(self):
+        core = LayoutCore()
+        rect = Rect(Vector2(0, 0), Vector2(1, 1))
+        core.set_edge(('a', 'b'), rect)
+        core.set_edge(('b', 'c'), rect)
+        core.remove_edge(('a', 'b'))
+        core.remove_node('a')
+        self.assertEqual([core.edges[i] for i in core.get_edge_ids()], [('b', 'c')])
+        core.set_edge(('c', 'd'), rect)
+        self.assertEqual(core.edge_ids[('c', 'd')], 0)
+        self.assertEqual(core.node_ids['d'], 0)
+        np.testing.assert_array_equal(core.edge_nodes[0], [2, 0])
+
+    def test_grow_nodes(self):
+        core = LayoutCore(capacity=2)
+        for i in range(5):
+            core.set_node_position(i, Vector2(i, -i))
+        np.testing.assert_array_equal(core.get_node_position(4), [4, -4])
+
+    def test_index(self):
+        core = LayoutCore()
+        rect = Rect(Vector2(0, 0), Vector2(1, 1))
+        core.set_edge(('a', 'b'), rect)
+        self.assertEqual(core.index.query(rect), {('a', 'b')})
+        self.assertEqual(tuple(core.get_edge_rect(('a', 'b'))), ((0, 0), (1, 1)))
+        core.remove_edge(('a', 'b'))
+        self.assertEqual(core.index.query(rect), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
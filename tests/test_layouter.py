@@ -0,0 +1,174 @@
+import os
+import random
+import unittest
+
+import networkx as nx
+import numpy as np
+from parameterized import parameterized
+
+import project_settings
+from reactor.budget import Budget, LayoutStatus, SearchMonitor
+from reactor.const import BLOCK, POSITION
+from reactor.edgeprofiles import EdgeProfiles
+from reactor.geometry.vector import Vector2
+from reactor.layouter import Layouter
+from reactor.map import Map
+from reactor.readers.streaminggexfreader import StreamingGEXFReader
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+NUM_PERMUTATIONS = 50
+
+
+class RecordingLayouter(Layouter):
+
+    """
+    Checks the block states after every backjump and records the jumps made.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jumps = []
+        self.test_case = None
+
+    def unwind(self, g, target, i):
+        conflicts = g.get_layouter(g.blocks[i]).conflicts
+        self.test_case.assertEqual(target, max(map(g.positions.get, conflicts)))
+        self.test_case.assertTrue(
+            conflicts - {g.blocks[target]} <= g.get_layouter(g.blocks[target]).conflicts
+        )
+        super().unwind(g, target, i)
+        self.jumps.append((target, i))
+
+        # The target keeps its remaining permutations, everything after it is
+        # reset, and the layout only holds the blocks before the target.
+        tlayouter = g.get_layouter(g.blocks[target])
+        self.test_case.assertFalse(tlayouter.done)
+        self.test_case.assertIsNotNone(tlayouter.permutations)
+        for block in g.blocks[target + 1:i + 1]:
+            layouter = g.get_layouter(block)
+            self.test_case.assertFalse(layouter.done)
+            self.test_case.assertIsNone(layouter.permutations)
+            self.test_case.assertEqual(layouter.conflicts, set())
+        placed = {
+            g.blocks[j] for j in range(target)
+            if g.get_layouter(g.blocks[j]).done
+        }
+        layout = self._map.layout
+        self.test_case.assertEqual(placed, set(g.blocks[:target]))
+        self.test_case.assertTrue(
+            {layout.edges[edge][BLOCK] for edge in layout.edges} <= placed
+        )
+
+
+class TestLayouter(unittest.TestCase):
+
+    def setUp(self):
+        self.profiles = EdgeProfiles.from_settings(project_settings.EDGE_WEIGHTS)
+
+    def create_layouter(self, name, seed, **kwargs):
+        g = StreamingGEXFReader()(os.path.join(DATA_PATH, name)).to_undirected()
+        return Layouter(
+            g,
+            Map(),
+            rng=random.Random(seed),
+            profiles=self.profiles,
+            **kwargs
+        )
+
+    def assert_layout_matches(self, layouter):
+        layout = layouter._map.layout
+        self.assertEqual(set(layout), set(layouter.g))
+        self.assertEqual(
+            {frozenset(edge) for edge in layout.edges},
+            {frozenset(edge) for edge in layouter.g.edges}
+        )
+
+    @parameterized.expand([
+        ('reactor2.gexf', 2),
+        ('reactor5.gexf', 0),
+        ('reactor5.gexf', 2),
+    ])
+    def test_backjump(self, name, seed):
+        g = StreamingGEXFReader()(os.path.join(DATA_PATH, name)).to_undirected()
+        layouter = RecordingLayouter(
+            g,
+            Map(),
+            rng=random.Random(seed),
+            profiles=self.profiles
+        )
+        layouter.test_case = self
+        bg = layouter.get_block_graph()
+        self.assertEqual(layouter.bfs(bg)[0], len(bg))
+        self.assert_layout_matches(layouter)
+
+        # At least one jump must skip over a block to be a backjump rather
+        # than a plain backtrack.
+        self.assertTrue(any(i - target > 1 for target, i in layouter.jumps))
+
+    def test_root_restart(self):
+
+        # A triangle can't be laid out orthogonally. Its face only depends on
+        # the root, so every failure jumps back to the root, which then has to
+        # start the search over.
+        g = nx.Graph()
+        for node, pos in (('a', (0, 0)), ('b', (1, 0)), ('c', (0, 1))):
+            g.add_node(node, **{POSITION: Vector2(*pos)})
+        g.add_edges_from((('a', 'b'), ('b', 'c'), ('c', 'a')))
+        layouter = RecordingLayouter(g, Map(), profiles=self.profiles)
+        layouter.test_case = self
+        bg = layouter.get_block_graph()
+        monitor = SearchMonitor(Budget(max_backtracks=6))
+        num_placed, status = layouter.bfs(bg, monitor)
+
+        self.assertEqual(status, LayoutStatus.BACKTRACKS_EXHAUSTED)
+        self.assertEqual(num_placed, 1)
+        self.assertEqual(set(layouter.jumps), {(0, 1)})
+        self.assertGreater(monitor.num_backtracks - len(layouter.jumps), 0)
+        self.assertEqual(len(layouter._map.layout.edges), 0)
+
+    @parameterized.expand([
+        ('reactor5.gexf', 0),
+        ('reactor5.gexf', 1),
+        ('reactor5.gexf', 2),
+    ])
+    def test_collision_matrix(self, name, seed):
+        layouter = self.create_layouter(name, seed)
+        bg = layouter.get_block_graph()
+        self.assertEqual(layouter.bfs(bg)[0], len(bg))
+
+        # Unwind the layout one block at a time, and test the permutations of
+        # each block against the layout that was there before it.
+        map_ = layouter._map
+        num_collisions = num_permutations = 0
+        for block in reversed(bg.blocks[1:]):
+            block_layouter = bg.get_layouter(block)
+            map_.layout.rollback(block_layouter.checkpoint)
+            stream = block_layouter.get_permutations(map_.layout)
+            perms = [perm for _, perm in zip(range(NUM_PERMUTATIONS), stream)]
+            edges, collisions = block_layouter.get_collision_matrix(perms, map_)
+            mask = block_layouter.get_feasibility_mask(perms, map_)
+            np.testing.assert_array_equal(
+                layouter._mask_permutations(block_layouter, bg, SearchMonitor(), perms),
+                mask
+            )
+            for perm, row, feasible in zip(perms, collisions, mask):
+                colliding = {edge for edge, collides in zip(edges, row) if collides}
+                self.assertEqual(colliding, set(block_layouter.get_colliding_edges(perm, map_)))
+                self.assertEqual(
+                    {map_.layout.edges[edge][BLOCK] for edge in colliding},
+                    block_layouter.get_culprits(perm, map_)
+                )
+                self.assertEqual(feasible, block_layouter.can_lay_out(perm, map_))
+            num_collisions += int(collisions.any(axis=1).sum())
+            num_permutations += len(perms)
+
+        # Make sure both outcomes were actually tested.
+        self.assertGreater(num_collisions, 0)
+        self.assertLess(num_collisions, num_permutations)
+
+
+if __name__ == '__main__':
+    unittest.main()
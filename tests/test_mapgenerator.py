@@ -0,0 +1,41 @@
+import os
+import unittest
+
+import project_settings
+from reactor.budget import Budget
+from reactor.edgeprofiles import EdgeProfiles
+from reactor.mapgenerator import MapGenerator
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestMapGenerator(unittest.TestCase):
+
+    def create_generator(self, name, **kwargs):
+        return MapGenerator(
+            os.path.join(DATA_PATH, name),
+            profiles=EdgeProfiles.from_settings(project_settings.EDGE_WEIGHTS),
+            **kwargs
+        )
+
+    def test_run_portfolio(self):
+        gen = self.create_generator('test1.gexf')
+        map_ = gen.run_portfolio(range(4), processes=2)
+        self.assertTrue(map_.layout_result.complete)
+        self.assertEqual(set(map_.layout), set(gen.load_graph()))
+
+    def test_run_portfolio_incomplete(self):
+
+        # One permutation isn't enough to place every block.
+        gen = self.create_generator('reactor5.gexf', budget=Budget(max_permutations=1))
+        self.assertIsNone(gen.run_portfolio(range(2), processes=2))
+
+    def test_run_portfolio_load_error(self):
+        gen = self.create_generator('missing.gexf')
+        with self.assertRaises(OSError):
+            gen.run_portfolio(range(2), processes=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from reactor.const import POSITION
+from reactor.mapplan import MapPlan
+from reactor.readers.gexfreader import GEXFReader
+
+
+class TestMapPlan(unittest.TestCase):
+
+    def get_node_data(self, g):
+        return [
+            (node, dict(data, **{POSITION: tuple(data[POSITION])}))
+            for node, data in g.nodes(data=True)
+        ]
+
+    @parameterized.expand([
+        '../data/grid2.gexf',
+        '../data/reactor5.gexf',
+        '../data/tree_and_cycle2.gexf',
+    ])
+    def test_save_load(self, graph_path):
+        g = GEXFReader()(graph_path).to_undirected()
+        plan = MapPlan.compile(g)
+        with tempfile.TemporaryDirectory() as dir_path:
+            path = os.path.join(dir_path, 'test.plan')
+            plan.save(path)
+            loaded = MapPlan.load(path)
+
+        self.assertEqual(self.get_node_data(loaded.g), self.get_node_data(plan.g))
+        self.assertEqual(list(loaded.g.edges(data=True)), list(plan.g.edges(data=True)))
+        self.assertEqual(loaded.parent_positions, plan.parent_positions)
+        for block, loaded_block in zip(plan.blocks, loaded.blocks):
+            self.assertIs(type(loaded_block), type(block))
+            self.assertEqual(self.get_node_data(loaded_block), self.get_node_data(block))
+            self.assertEqual(list(loaded_block.edges(data=True)), list(block.edges(data=True)))
+            self.assertEqual(loaded_block.graph, block.graph)
+
+        bg = loaded.get_block_graph()
+        self.assertEqual(bg.blocks, loaded.blocks)
+        self.assertIsNone(bg.parent(loaded.blocks[0]))
+        for block, parent_position in zip(loaded.blocks[1:], loaded.parent_positions[1:]):
+            self.assertIs(bg.parent(block), loaded.blocks[parent_position])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from reactor.blocks.edgeblock import EdgeBlock
+from reactor.blocks.rootblock import RootBlock
+from reactor.const import BLOCK, DIRECTION, POSITION, Direction
+from reactor.geometry.rect import FrozenRect
+from reactor.geometry.vector import Vector2
+from reactor.nogoodstore import NogoodStore
+from reactor.orthogonallayout import OrthogonalLayout
+
+
+class TestNogoodStore(unittest.TestCase):
+
+    def create_block(self, u, v):
+        block = EdgeBlock()
+        block.add_edge(u, v)
+        return block
+
+    def add_edge(self, layout, block, positions, direction):
+        u, v = block.edge
+        layout.update_node(u, {POSITION: Vector2(*positions[0])})
+        layout.update_node(v, {POSITION: Vector2(*positions[1])})
+        layout.update_edge(u, v, {BLOCK: block, DIRECTION: direction})
+        rect = FrozenRect.from_points(*positions).inflated(0.5)
+        layout.set_edge_rect((u, v), rect)
+
+    def create_layout(self, offset=(0, 0), culprit_end=(10, 4)):
+        """
+        Lay out a parent edge a -> b and an unrelated edge c -> d. The block
+        under test is the edge b -> e.
+
+        """
+        ox, oy = offset
+        layout = OrthogonalLayout()
+        self.add_edge(layout, self.parent, ((ox, oy), (ox + 4, oy)), Direction.RIGHT)
+        end = ox + culprit_end[0], oy + culprit_end[1]
+        self.add_edge(layout, self.culprit, ((ox + 10, oy), end), Direction.UP)
+        return layout
+
+    def setUp(self):
+        self.parent = self.create_block('a', 'b')
+        self.culprit = self.create_block('c', 'd')
+        self.block = self.create_block('b', 'e')
+
+    def test_find(self):
+        store = NogoodStore()
+        store.add(self.block, self.create_layout(), {self.parent, self.culprit})
+        self.assertEqual(len(store), 1)
+
+        # The nogood matches wherever the same geometry is laid out.
+        for offset in ((0, 0), (-3, 7)):
+            culprits = store.find(self.block, self.create_layout(offset))
+            self.assertEqual(set(culprits), {('a', 'b'), ('c', 'd')})
+
+        # It doesn't match if a culprit has moved.
+        layout = self.create_layout(culprit_end=(10, 6))
+        self.assertIsNone(store.find(self.block, layout))
+
+    def test_data(self):
+        store = NogoodStore()
+        store.add(self.block, self.create_layout(), {self.parent, self.culprit})
+        mark = store.mark()
+        self.assertEqual(store.to_data(mark), [])
+        loaded = NogoodStore.from_data(store.to_data())
+        self.assertEqual(len(loaded), 1)
+        culprits = loaded.find(self.block, self.create_layout())
+        self.assertEqual(set(culprits), {('a', 'b'), ('c', 'd')})
+
+    def test_save_load(self):
+        store = NogoodStore()
+        store.add(self.block, self.create_layout(), {self.parent, self.culprit})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'nogoods.json')
+            store.save(path)
+            self.assertEqual(NogoodStore.load(path).to_data(), store.to_data())
+
+            # Unversioned files from older versions are rejected.
+            with open(path, 'w') as f:
+                json.dump(store.to_data(), f)
+            with self.assertRaises(ValueError):
+                NogoodStore.load(path)
+
+    def test_empty_context(self):
+
+        # The first block off the root has no laid out edges around it, and
+        # its only conflict places none either. Storing this would make it
+        # match every context.
+        layout = OrthogonalLayout()
+        layout.update_node('a', {POSITION: Vector2(0, 0)})
+        root = RootBlock()
+        root.add_node('a')
+        store = NogoodStore()
+        store.add(self.parent, layout, {root})
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(store.find(self.parent, layout))
+
+        # Nor is a nogood stored without culprits.
+        store.add(self.block, self.create_layout(), {root})
+        self.assertEqual(len(store), 0)
+
+        # Empty nogoods saved by older versions are skipped on load.
+        data = [{'block': ['a', 'b'], 'constraints': [], 'culprits': []}]
+        self.assertEqual(len(NogoodStore.from_data(data)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+import project_settings
+from reactor.const import POSITION
+from reactor.edgeprofiles import EdgeProfiles
+from reactor.layouter import Layouter
+from reactor.map import Map
+from reactor.readers.streaminggexfreader import StreamingGEXFReader
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+class TestOrthogonalLayout(unittest.TestCase):
+
+    def get_node_data(self, layout):
+        return {
+            node: dict(data, **{POSITION: tuple(data[POSITION])})
+            for node, data in layout.nodes(data=True)
+        }
+
+    def get_core_data(self, core):
+        positions = {
+            node: tuple(core.get_node_position(node)) for node in core.node_ids
+        }
+        edges = {}
+        for edge, edge_id in core.edge_ids.items():
+            edges[edge] = (
+                tuple(core.nodes[node_id] for node_id in core.edge_nodes[edge_id]),
+                int(core.directions[edge_id]),
+                float(core.lengths[edge_id]),
+                int(core.weights[edge_id]),
+                tuple(core.rects[edge_id]),
+            )
+        return positions, edges
+
+    def assert_layouts_equal(self, layout, expected):
+        self.assertEqual(self.get_node_data(layout), self.get_node_data(expected))
+        self.assertEqual(list(layout.edges(data=True)), list(expected.edges(data=True)))
+        self.assertEqual(
+            {edge: tuple(rect) for edge, rect in layout.edge_rects.items()},
+            {edge: tuple(rect) for edge, rect in expected.edge_rects.items()}
+        )
+        for edge in expected.edge_rects:
+            self.assertIn(edge, layout.edge_index.query(expected.edge_rects[edge]))
+        self.assertEqual(len(layout.edge_index), len(expected.edge_index))
+        positions, edges = self.get_core_data(layout.core)
+        expected_positions, expected_edges = self.get_core_data(expected.core)
+        self.assertEqual(positions, expected_positions)
+        self.assertEqual(edges.keys(), expected_edges.keys())
+        for edge, data in edges.items():
+
+            # Lengths may be nan, which assert_equal treats as equal.
+            np.testing.assert_equal(data, expected_edges[edge])
+        self.assertEqual(layout.angles._angles, expected.angles._angles)
+        self.assertEqual(layout.angles._totals, expected.angles._totals)
+
+    @parameterized.expand([
+        ('test2.gexf', 0),
+        ('reactor5.gexf', 0),
+    ])
+    def test_rollback(self, name, seed):
+        g = StreamingGEXFReader()(os.path.join(DATA_PATH, name)).to_undirected()
+        profiles = EdgeProfiles.from_settings(project_settings.EDGE_WEIGHTS)
+        map_ = Map()
+        layouter = Layouter(g, map_, rng=random.Random(seed), profiles=profiles)
+        bg = layouter.get_block_graph()
+        self.assertEqual(layouter.bfs(bg)[0], len(bg))
+
+        # Unwind the layout one block at a time. At each step, lay the block
+        # out again with a different permutation and roll that back.
+        layout = map_.layout
+        for block in reversed(bg.blocks[1:]):
+            block_layouter = bg.get_layouter(block)
+            layout.rollback(block_layouter.checkpoint)
+            expected = layout.copy()
+            checkpoint = layout.checkpoint()
+            perms = block_layouter.get_permutations(layout)
+            perm = next(perm for perm in perms if block_layouter.can_lay_out(perm, map_))
+            block_layouter.add_to_layout(perm, layout)
+            self.assertGreater(len(layout.edge_rects), len(expected.edge_rects))
+            layout.rollback(checkpoint)
+            self.assert_layouts_equal(layout, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
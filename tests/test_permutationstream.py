@@ -0,0 +1,36 @@
+import unittest
+
+from reactor.layouters.permutationstream import PermutationStream
+
+
+class TestPermutationStream(unittest.TestCase):
+
+    def test_lazy(self):
+        built = []
+
+        def factory(key):
+            built.append(key)
+            return key * 10
+
+        stream = PermutationStream([1, 2, 3], factory)
+        self.assertTrue(stream)
+        self.assertEqual(next(stream), 10)
+        self.assertEqual(built, [1])
+        self.assertEqual(list(stream), [20, 30])
+        self.assertFalse(stream)
+
+    def test_mask(self):
+        stream = PermutationStream(range(10), lambda key: key)
+        stream.mask_func = lambda perms: [perm % 2 == 0 for perm in perms]
+        self.assertEqual(list(stream), [0, 2, 4, 6, 8])
+
+    def test_clear(self):
+        stream = PermutationStream([1, 2, 3], lambda key: key)
+        next(stream)
+        stream.clear()
+        self.assertFalse(stream)
+        self.assertEqual(list(stream), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
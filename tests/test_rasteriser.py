@@ -0,0 +1,63 @@
+import struct
+import unittest
+import zlib
+
+import numpy as np
+
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import Rect
+from reactor.map import Map
+from reactor.rasteriser import (
+    BACKGROUND_COLOUR,
+    EDGE_COLOUR,
+    NODE_COLOUR,
+    ROOM_COLOUR,
+    MapRasteriser,
+    PNG_SIGNATURE,
+    encode_png,
+)
+
+
+class TestRasteriser(unittest.TestCase):
+
+    def decode_png(self, data):
+        self.assertEqual(data[:8], PNG_SIGNATURE)
+        chunks = {}
+        i = 8
+        while i < len(data):
+            length, = struct.unpack('>I', data[i:i + 4])
+            chunk = data[i + 4:i + 8 + length]
+            crc, = struct.unpack('>I', data[i + 8 + length:i + 12 + length])
+            self.assertEqual(zlib.crc32(chunk), crc)
+            chunks[chunk[:4]] = chunk[4:]
+            i += 12 + length
+        width, height = struct.unpack('>II', chunks[b'IHDR'][:8])
+        rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8)
+        rows = rows.reshape(height, width * 3 + 1)
+        self.assertFalse(rows[:, 0].any())
+        return rows[:, 1:].reshape(height, width, 3)
+
+    def test_encode_png(self):
+        image = np.random.default_rng(0).integers(0, 256, (5, 7, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(self.decode_png(encode_png(image)), image)
+
+    def test_render(self):
+        map_ = Map()
+        map_.layout.add_node(1, position=Point2(0, 0))
+        map_.layout.add_node(2, position=Point2(4, 0))
+        map_.layout.add_edge(1, 2)
+        map_.layout.set_edge_rect((1, 2), Rect(Point2(0, -0.5), Point2(4, 0.5)))
+        map_.rooms.append(Rect(Point2(3, -2), Point2(5, 2)))
+        image = MapRasteriser(scale=2, padding=1, node_size=1).render(map_)
+
+        # Extents are x -1 to 6 and y -3 to 3, in units of two pixels.
+        self.assertEqual(image.shape, (12, 14, 3))
+        self.assertEqual(tuple(image[0, 0]), BACKGROUND_COLOUR)
+        self.assertEqual(tuple(image[1, 9]), BACKGROUND_COLOUR)
+        self.assertEqual(tuple(image[2, 9]), ROOM_COLOUR)
+        self.assertEqual(tuple(image[5, 4]), EDGE_COLOUR)
+        self.assertEqual(tuple(image[5, 2]), NODE_COLOUR)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import pickle
+import unittest
+
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect, Rect
+from reactor.geometry.vector import Vector2
+
+
+class TestFrozenRect(unittest.TestCase):
+
+    def test_from_points(self):
+        rect = FrozenRect.from_points(Point2(2, -1), Vector2(0, 3))
+        self.assertEqual(rect, (Point2(0, -1), Point2(2, 3)))
+        self.assertEqual((rect.width, rect.height), (2, 4))
+        self.assertEqual(rect.centre, Point2(1, 1))
+
+    def test_inflated(self):
+        rect = FrozenRect(Point2(0, 0), Point2(1, 1))
+        self.assertEqual(rect.inflated(0.5), (Point2(-0.5, -0.5), Point2(1.5, 1.5)))
+        self.assertEqual(rect, (Point2(0, 0), Point2(1, 1)))
+
+    def test_intersects_rect(self):
+        rect = FrozenRect(Point2(0, 0), Point2(2, 2))
+        self.assertTrue(rect.intersects(Rect(Vector2(1, 1), Vector2(3, 3))))
+        self.assertFalse(rect.intersects(Rect(Vector2(2, 0), Vector2(3, 3))))
+        self.assertTrue(rect.touches(Rect(Vector2(2, 0), Vector2(3, 3))))
+
+    def test_pickle(self):
+        rect = FrozenRect(Point2(0, 1), Point2(2, 3))
+        self.assertEqual(pickle.loads(pickle.dumps(rect)), rect)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from reactor.geometry.point import Point2
+from reactor.geometry.rect import FrozenRect
+from reactor.geometry.rectset import RectSet
+
+
+def rect(x1, y1, x2, y2):
+    return FrozenRect(Point2(x1, y1), Point2(x2, y2))
+
+
+class TestRectSet(unittest.TestCase):
+
+    def setUp(self):
+        self.rects = [rect(0, 0, 2, 2), rect(2, 0, 4, 2), rect(5, 5, 6, 6)]
+        self.rect_set = RectSet(self.rects, keys=['a', 'b', 'c'])
+
+    def test_one_vs_many(self):
+        other = rect(1, 1, 3, 3)
+        self.assertEqual(
+            self.rect_set.intersects(other).tolist(),
+            [r.intersects(other) for r in self.rects]
+        )
+        self.assertEqual(self.rect_set.touches(rect(4, 2, 5, 5)).tolist(), [False, True, True])
+        self.assertEqual(self.rect_set.get_intersecting_keys(other), ['a', 'b'])
+
+    def test_many_vs_many(self):
+        others = [rect(1, 1, 3, 3), rect(5.5, 5.5, 7, 7)]
+        expected = [[r.intersects(o) for o in others] for r in self.rects]
+        self.assertEqual(self.rect_set.intersects(others).tolist(), expected)
+        self.assertEqual(self.rect_set.intersects(RectSet(others)).tolist(), expected)
+        rows, cols = self.rect_set.get_intersecting_pairs(others)
+        self.assertEqual(list(zip(rows, cols)), [(0, 0), (1, 0), (2, 1)])
+
+    def test_contains_points(self):
+        points = np.array([[1, 1], [2, 1], [9, 9]])
+        self.assertEqual(self.rect_set.contains_points(points).any(axis=0).tolist(), [True, True, False])
+        self.assertEqual(self.rect_set.contains_points((2, 1)).tolist(), [True, True, False])
+
+    def test_append_remove(self):
+        self.rect_set.remove('a')
+        self.rect_set.remove('a')
+        self.assertEqual(sorted(self.rect_set), ['b', 'c'])
+        self.assertEqual(self.rect_set.get('c'), self.rects[2])
+        for i in range(20):
+            self.rect_set.append(rect(i, i, i + 1, i + 1))
+        self.rect_set.append(rect(0, 0, 1, 1), 'b')
+        self.assertEqual(len(self.rect_set), 22)
+        self.assertEqual(self.rect_set.get('b'), rect(0, 0, 1, 1))
+        self.assertEqual(self.rect_set.get(19), rect(19, 19, 20, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
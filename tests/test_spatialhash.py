@@ -0,0 +1,36 @@
+import unittest
+
+from reactor.geometry.rect import Rect
+from reactor.geometry.spatialhash import SpatialHash
+from reactor.geometry.vector import Vector2
+
+
+class TestSpatialHash(unittest.TestCase):
+
+    def test_query(self):
+        index = SpatialHash(cell_size=4)
+        index.insert('a', Rect(Vector2(0, 0), Vector2(1, 1)))
+        index.insert('b', Rect(Vector2(-0.5, -0.5), Vector2(0.5, 9.5)))
+        index.insert('c', Rect(Vector2(20, 20), Vector2(21, 21)))
+        self.assertEqual(index.query(Rect(Vector2(1, 1), Vector2(2, 2))), {'a', 'b'})
+        self.assertEqual(index.query(Rect(Vector2(1, 9), Vector2(2, 10))), {'b'})
+        self.assertEqual(index.query(Rect(Vector2(10, 10), Vector2(11, 11))), set())
+
+    def test_remove(self):
+        index = SpatialHash(cell_size=4)
+        index.insert('a', Rect(Vector2(0, 0), Vector2(10, 1)))
+        index.remove('a')
+        index.remove('a')
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.query(Rect(Vector2(0, 0), Vector2(10, 1))), set())
+
+    def test_reinsert_moves_key(self):
+        index = SpatialHash(cell_size=4)
+        index.insert('a', Rect(Vector2(0, 0), Vector2(1, 1)))
+        index.insert('a', Rect(Vector2(8, 8), Vector2(9, 9)))
+        self.assertEqual(index.query(Rect(Vector2(0, 0), Vector2(1, 1))), set())
+        self.assertEqual(index.query(Rect(Vector2(8, 8), Vector2(9, 9))), {'a'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from reactor.const import POSITION, WEIGHT
+from reactor.readers.gexfreader import GEXFReader
+from reactor.readers.streaminggexfreader import StreamingGEXFReader
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+# Grids with edge weights that aren't whole numbers, which both readers
+# reject.
+BAD_WEIGHT_GRIDS = {'grid3.gexf'}
+
+
+def get_grid_paths():
+    return [
+        os.path.join(DATA_PATH, name)
+        for name in sorted(os.listdir(DATA_PATH))
+        if os.path.splitext(name)[-1] == '.gexf' and name not in BAD_WEIGHT_GRIDS
+    ]
+
+COLLIDING_IDS_GEXF = """<?xml version="1.0" encoding="UTF-8"?>
+<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2"
+    xmlns:viz="http://www.gexf.net/1.2draft/viz">
+    <graph mode="static" defaultedgetype="directed">
+        <attributes class="node" mode="static">
+            <attribute id="0" title="kind" type="string"/>
+        </attributes>
+        <attributes class="edge" mode="static">
+            <attribute id="0" title="weight" type="double"/>
+        </attributes>
+        <nodes>
+            <node id="a" label="">
+                <attvalues>
+                    <attvalue for="0" value="hall"/>
+                </attvalues>
+                <viz:position x="0" y="0"/>
+            </node>
+            <node id="b" label="">
+                <viz:position x="1" y="0"/>
+            </node>
+            <node id="c" label="">
+                <attvalues>
+                    <attvalue for="0" value="hall"/>
+                </attvalues>
+                <viz:position x="2" y="0"/>
+            </node>
+        </nodes>
+        <edges>
+            <edge id="0" source="b" target="c"/>
+            <edge id="1" source="a" target="b">
+                <attvalues>
+                    <attvalue for="0" value="3"/>
+                </attvalues>
+            </edge>
+        </edges>
+    </graph>
+</gexf>
+"""
+
+
+class TestStreamingGEXFReader(unittest.TestCase):
+
+    @parameterized.expand(get_grid_paths())
+    def test_matches_gexf_reader(self, grid_path):
+        expected = GEXFReader()(grid_path)
+        g = StreamingGEXFReader()(grid_path)
+
+        self.assertIs(type(g), type(expected))
+        self.assertEqual(list(g), list(expected))
+        self.assertEqual(list(g.edges), list(expected.edges))
+        for node in g:
+            np.testing.assert_array_equal(
+                g.nodes[node][POSITION],
+                expected.nodes[node][POSITION]
+            )
+        for edge in g.edges:
+            self.assertEqual(
+                g.edges[edge].get(WEIGHT),
+                expected.edges[edge].get(WEIGHT)
+            )
+
+    def test_colliding_attribute_ids(self):
+
+        # The node and edge attributes share an id, and only the edge one is a
+        # weight.
+        with tempfile.TemporaryDirectory() as dir_path:
+            path = os.path.join(dir_path, 'test.gexf')
+            with open(path, 'w') as f:
+                f.write(COLLIDING_IDS_GEXF)
+            expected = GEXFReader()(path)
+            g = StreamingGEXFReader()(path)
+        self.assertEqual(list(g.edges(data=WEIGHT)), list(expected.edges(data=WEIGHT)))
+        self.assertEqual(list(g.edges(data=WEIGHT)), [('a', 'b', 3), ('b', 'c', None)])
+
+    @parameterized.expand([GEXFReader, StreamingGEXFReader])
+    def test_bad_weight(self, reader_cls):
+        with self.assertRaises(ValueError):
+            reader_cls()(os.path.join(DATA_PATH, 'grid3.gexf'))
+
+
+if __name__ == '__main__':
+    unittest.main()